@@ -1,404 +1,263 @@
-import numpy as np
 from tkinter import *
 from PIL import Image, ImageTk
 from tkinter import font as font
+import queue
+import threading
+import numpy as np
+from maze_search import Maze, Bidirectional_Search
+from search_trace import trace_path
+from solver import ALGORITHMS, TREE_SEARCH_LIMIT
 
+FRAME_MS = 33  # time between two frames of the search page, about 30 frames per second
 
-class Maze:
-    maze = None
-    __walls = None
-    __start = None # name of the room
-    __goal = None # name of the room
-    __search_algorithm = None
-
-    def __init__(self):
-        self.maze = np.array([
-            ['A', 'B', 'C'],
-            ['D', 'E', 'F'],
-            ['G', 'H', 'I']
-        ])
-        self.__walls = {
-            "AB": False,
-            "AD": False,
-            "BC": False,
-            "BE": False,
-            "CF": False,
-            "DE": False,
-            "DG": False,
-            "EF": False,
-            "EH": False,
-            "FI": False,
-            "GH": False,
-            "HI": False
-        }
-        self.__start = ""
-        self.__goal = ""
-        self.__search_algorithm = ""
-
-    def set_start(self, start: str):
-        self.__start = start
-
-    def set_goal(self, goal: str):
-        self.__goal = goal
-
-    def set_search_algorithm(self, search_algorithm):
-        self.__search_algorithm = search_algorithm
-
-    def get_start(self):
-        return self.__start
-
-    def get_goal(self):
-        return self.__goal
-
-    def get_search_algorithm(self):
-        return self.__search_algorithm
-
-    def get_walls(self):
-        return self.__walls
-
-    def set_walls(self, wall_edges):
-        for wall in wall_edges:
-            wall_set = wall[0] + wall[2]
-            self.__walls[wall_set] = True
-
-    def coordinate(self, l: str):
-        """
-            Returns the coordinates of a room in ndarray
-        """
-        for i in range(3):
-            for j in range(3):
-                if self.maze[i][j] == l:
-                    c = (i, j)
-                    return c
-
-    def room_name(self, t):
-        return self.maze[t[0]][t[1]]
-
-    def neighbors(self, c_room: str):
-        """Looks the neighbor rooms of the current room and if there is no wall between them, adds to the dictionary
-        :param c_room: room that's neighbors will be found
-        :return: dictionary that has the room names as key and cost to reach them as value
-        """
-        n_dict = {}
-        c_coordinate = self.coordinate(c_room)  # coordinates of the current room
-        # look up
-        if c_coordinate[0] != 0:
-            up_room = self.maze[c_coordinate[0] - 1][c_coordinate[1]]
-            try:
-                if self.__walls[up_room + c_room] is False:
-                    n_dict[up_room] = 1
-            except KeyError:
-                if self.__walls[c_room + up_room] is False:
-                    n_dict[up_room] = 1
-        # look down
-        if c_coordinate[0] != 2:
-            down_room = self.maze[c_coordinate[0] + 1][c_coordinate[1]]
-            try:
-                if self.__walls[down_room + c_room] is False:
-                    n_dict[down_room] = 1
-            except KeyError:
-                if self.__walls[c_room + down_room] is False:
-                    n_dict[down_room] = 1
-        # look right
-        if c_coordinate[1] != 2:
-            right_room = self.maze[c_coordinate[0]][c_coordinate[1] + 1]
-            try:
-                if self.__walls[c_room + right_room] is False:
-                    n_dict[right_room] = 2
-            except KeyError:
-                if self.__walls[right_room + c_room] is False:
-                    n_dict[right_room] = 2
-        # look left
-        if c_coordinate[1] != 0:
-            left_room = self.maze[c_coordinate[0]][c_coordinate[1] - 1]
-            try:
-                if self.__walls[c_room + left_room] is False:
-                    n_dict[left_room] = 2
-            except KeyError:
-                if self.__walls[left_room + c_room] is False:
-                    n_dict[left_room] = 2
-        return n_dict
-
-    def __str__(self):
-        """
-        :return: the image of the maze as string
-        """
-        maze_str = ""
-        for i in range(3):
-            for j in range(3):
-                maze_str = maze_str + "\t" + self.maze[i][j] + "\t"
-
-                if j != 2:
-                    neighbor_wall = self.maze[i][j] + self.maze[i][j + 1]
-                    if self.__walls[neighbor_wall] is True:
-                        maze_str = maze_str + "|"
-
-            maze_str += "\n"
-            for j in range(3):
-                if i != 2:
-                    neighbor_wall = self.maze[i][j] + self.maze[i + 1][j]
-
-                    if self.__walls[neighbor_wall] is True:
-                        maze_str += "   ___\t"
-                    else:
-                        maze_str += "    \t"
-
-            maze_str += "\n\n"
-
-        return maze_str
+FRONTIER_LINES = 12  # the frontier label shows that many paths at most
 
 
-class Frontier:
+class Maze_Canvas:
     """
-        A sorted list that holds tuple(path, cost)
-    """
-    __frontier = None
-    __size = None
-
-    def __init__(self):
-        self.__frontier = []
-        self.__size = 0
+        Canvas view of a maze of any size. The rooms are drawn once as rectangles and the walls as lines,
+        after that only the rooms whose state changed are recolored, so a step costs as much as the rooms it touches.
 
-    def get_size(self):
-        return self.__size
-
-    def add_path(self, path_tuple: tuple):
-        self.__frontier.append(path_tuple)
-        self.__size += 1
+        A room is "empty", "frontier" (pushed but not expanded), "expanded", on the current "path" or on the "solution".
+        The path and the solution are drawn over the other states and the room goes back to its state when it leaves them.
+        The expansions of every room and of its neighbors are counted, so an expansion can be undone to replay backwards.
+    """
+    COLORS = {"empty": "white", "frontier": "#fff3b0", "expanded": "#cfd8dc", "path": "#90caf9", "solution": "#a5d6a7"}
 
-    def sort_frontier(self):
+    __canvas = None
+    __maze = None
+    __cell_size = None
+    __cells = None  # room index -> rectangle item
+    __states = None  # room index -> drawn state
+    __expanded_counts = None  # room index -> times the room is expanded
+    __reached_counts = None  # room index -> times a neighbor of the room is expanded
+    __path = None  # rooms that are drawn as the path or the solution
+    __robot = None  # image item of the robot
+    __robot_image = None
+
+    def __init__(self, master, maze: Maze, size: int = 500, robot_image=None):
         """
-        Sort the frontier considering the cost of the paths (second element in tuples)
-        if same, then sort by alphabetic order
-
-        length of the paths might also be considered for sorting
+        :param size: width or height in pixels of the longest side of the maze
+        :param robot_image: PIL image that is drawn on the expanded room when the rooms are large enough
         """
-        self.__frontier.sort(key=lambda tup: tup[1])
-        if self.__size >= 2:
-            if self.__frontier[0][1] == self.__frontier[1][1] and self.__frontier[0][0][-1:] > self.__frontier[1][0][-1:]:
-                tmp_tuple = self.__frontier[0]
-                self.__frontier[0] = self.__frontier[1]
-                self.__frontier[1] = tmp_tuple
-
-    def remove_path(self):
+        self.__maze = maze
+        self.__cell_size = max(2, min(size // max(maze.get_width(), maze.get_height()), 150))
+        self.__canvas = Canvas(master=master, width=self.get_pixel_width(), height=self.get_pixel_height(),
+                               background="white", highlightthickness=0)
+        room_count = maze.get_room_count()
+        self.__cells = [None] * room_count
+        self.__states = ["empty"] * room_count
+        self.__expanded_counts = [0] * room_count
+        self.__reached_counts = [0] * room_count
+        self.__path = set()
+        if robot_image is not None and self.__cell_size >= 30:
+            robot_size = self.__cell_size * 2 // 3
+            self.__robot_image = ImageTk.PhotoImage(robot_image.resize((robot_size, robot_size)), master=master)
+
+    def get_canvas(self):
+        return self.__canvas
+
+    def get_pixel_width(self):
+        return self.__cell_size * self.__maze.get_width() + 2
+
+    def get_pixel_height(self):
+        return self.__cell_size * self.__maze.get_height() + 2
+
+    def __cell_box(self, r: int):
+        i, j = self.__maze.room_coordinate(r)
+        c = self.__cell_size
+        return j * c + 1, i * c + 1, (j + 1) * c + 1, (i + 1) * c + 1
+
+    def draw(self):
         """
-        Remove the first element (lowest cost) from frontier
-        :return: Removed item
+        Draw all the rooms and walls, called once
         """
-        if self.__size == 0:
-            print("Fringe is already empty")
-            return False
-        else:
-            self.__size -= 1
-            return self.__frontier.pop(0)
-
-    def get_frontier_information(self):
+        canvas = self.__canvas
+        c = self.__cell_size
+        start = self.__maze.room_id(self.__maze.get_start())
+        goal = self.__maze.room_id(self.__maze.get_goal())
+        room_font = font.Font(weight="bold", size=max(6, c // 5)) if c >= 24 else None
+
+        for r in range(self.__maze.get_room_count()):
+            outline = "green" if r == start else "red" if r == goal else ""
+            self.__cells[r] = canvas.create_rectangle(*self.__cell_box(r), fill=self.COLORS["empty"], outline=outline, width=2 if outline else 0)
+            if room_font is not None:
+                x0, y0, x1, y1 = self.__cell_box(r)
+                canvas.create_text((x0 + x1) // 2, y0 + c // 6, text=self.__maze.get_room_name(r), font=room_font,
+                                   fill="green" if r == start else "red" if r == goal else "black", anchor=N)
+
+        # a wall line is 1/10 of a room thick
+        wall_width = max(1, c // 10)
+        horizontal_walls, vertical_walls = self.__maze.get_wall_arrays()
+        for i, j in np.argwhere(horizontal_walls):
+            canvas.create_line((j + 1) * c + 1, i * c + 1, (j + 1) * c + 1, (i + 1) * c + 1, width=wall_width)
+        for i, j in np.argwhere(vertical_walls):
+            canvas.create_line(j * c + 1, (i + 1) * c + 1, (j + 1) * c + 1, (i + 1) * c + 1, width=wall_width)
+        canvas.create_rectangle(1, 1, self.get_pixel_width() - 1, self.get_pixel_height() - 1, width=wall_width)
+
+        if self.__robot_image is not None:
+            x0, y0, x1, y1 = self.__cell_box(start)
+            self.__robot = canvas.create_image((x0 + x1) // 2, (y0 + y1) // 2 + c // 10, image=self.__robot_image)
+
+    def set_room_state(self, r: int, state: str):
         """
-        :return: string that contains the frontier elements
+        Recolor a room, nothing is done when the room is already in that state
         """
-        fringe_str = ""
-        for i in range(self.__size):
-            fringe_str += "{:<8s} ({:d})\n".format(self.__frontier[i][0], self.__frontier[i][1])
-        return fringe_str
-
-
-class Uniform_Cost_Search:
-    __start = None # coordinate tuple
-    __goal = None  # coordinates from maze ndarray
-    __maze = None
-    __frontier = None
-    __solution = None
-    __expanded_path = None
-    __expanded_cost = None
-    __expanded_room = None
-
-    def __init__(self, start_room: str, goal_room: str, m: Maze):
-        self.__frontier = Frontier()
-        self.__maze = m
-        self.__start = self.__maze.coordinate(start_room)
-        self.__goal = self.__maze.coordinate(goal_room)
-        self.__solution = ""
-        self.__expanded_path = ""
-        self.__expanded_cost = 0
-        self.__expanded_room = ""
+        if self.__states[r] != state:
+            self.__states[r] = state
+            self.__canvas.itemconfig(self.__cells[r], fill=self.COLORS[state])
 
-    def get_start_room(self):
-        return self.__maze.room_name(self.__start)
-
-    def get_goal_room(self):
-        return self.__maze.room_name(self.__goal)
-
-    def get_expanded_path(self):
-        return self.__expanded_path
-
-    def get_expanded_cost(self):
-        return self.__expanded_cost
-
-    def get_expanded_room(self):
-        return self.__expanded_room
-
-    def frontier_information(self):
+    def __search_state(self, r: int):
         """
-        :return: String that contains the elements of the frontier
+        :return: "expanded", "frontier" (a neighbor is expanded) or "empty"
         """
-        return self.__frontier.get_frontier_information()
+        if self.__expanded_counts[r] != 0:
+            return "expanded"
+        return "frontier" if self.__reached_counts[r] != 0 else "empty"
 
-    def start_search(self):
+    def count_expansion(self, r: int, change: int = 1):
         """
-            Initialize the search by pushing the start room to frontier
+        Count an expansion of a room (change=1) or undo it (change=-1) and redraw the rooms that it changes:
+        the room itself and its neighbors
         """
-        tmp_path = self.__maze.maze[self.__start[0]][self.__start[1]]
-        tmp_cost = 0
-        self.__frontier.add_path((tmp_path, tmp_cost))
-
-    def expand_room(self):
+        self.__expanded_counts[r] += change
+        if r not in self.__path:
+            self.set_room_state(r, self.__search_state(r))
+        start, end = self.__maze.neighbor_range(r)
+        neighbor_index = self.__maze.get_adjacency()[0]
+        for k in range(start, end):
+            neighbor = neighbor_index[k]
+            self.__reached_counts[neighbor] += change
+            if neighbor not in self.__path:
+                self.set_room_state(neighbor, self.__search_state(neighbor))
+
+    def show_path(self, rooms, state: str = "path"):
         """
-        Expand the room from the path that has the lowest cost. Set the solution until the goal is reached or frontier is empty.
-        :return: True if there cannot be no more expand
+        :param rooms: room indexes of the new path, the rooms of the old path that are not on it are restored
         """
-        if self.__frontier.get_size() == 0:
-            print("Fringe is empty. Cannot continue to search.")
-            self.__solution = False
-            return True
-
-        expanded_tuple = self.__frontier.remove_path()
-        self.__expanded_path = expanded_tuple[0]
-        self.__expanded_cost = expanded_tuple[1]
-        self.__expanded_room = self.__expanded_path[-1:]
-
-        if self.__maze.coordinate(self.__expanded_room) == self.__goal: # if coordinates are equal
-            self.__solution = expanded_tuple
-            return True
-
-        neighbor_dict = self.__maze.neighbors(self.__expanded_room)
-
-        if len(neighbor_dict) != 0:
-            for key in neighbor_dict.keys():
-                if len(self.__expanded_path) >= 3:
-                    if key != self.__expanded_path[len(self.__expanded_path) - 3]:  # do not turn back
-                        tmp_path = self.__expanded_path + "-" + key
-                        tmp_cost = self.__expanded_cost + neighbor_dict[key]
-                        self.__frontier.add_path((tmp_path, tmp_cost))
-                else:
-                    tmp_path = self.__expanded_path + "-" + key
-                    tmp_cost = self.__expanded_cost + neighbor_dict[key]
-                    self.__frontier.add_path((tmp_path, tmp_cost))
-
-        self.__frontier.sort_frontier()
-
-    def get_solution(self):
-        if not self.__solution:
-            return "Solution cannot be found"
-        else: # solution is set as expanded tuple if the expanded node is equal to goal
-            return "{: <15} :{: <5}".format(self.__solution[0], self.__solution[1])
-
-
-class A_Star_Search:
-    __start = None # coordinate tuple
-    __goal = None  # coordinates from maze ndarray
-    __maze = None
-    __frontier = None
-    __solution = None
-    __expanded_path = None
-    __expanded_cost = None
-    __expanded_room = None
-
-    def __init__(self, start_room: str, goal_room: str, m: Maze):
-        self.__frontier = Frontier()
-        self.__maze = m
-        self.__start = self.__maze.coordinate(start_room)
-        self.__goal = self.__maze.coordinate(goal_room)
-        self.__solution = ""
-        self.__expanded_path = ""
-        self.__expanded_cost = 0
-        self.__expanded_room = ""
-
-    def get_start_room(self):
-        return self.__maze.room_name(self.__start)
-
-    def get_goal_room(self):
-        return self.__maze.room_name(self.__goal)
-
-    def get_expanded_path(self):
-        return self.__expanded_path
-
-    def get_expanded_cost(self):
-        return self.__expanded_cost
-
-    def get_expanded_room(self):
-        return self.__expanded_room
-
-    def frontier_information(self):
+        rooms = set(rooms)
+        for r in self.__path - rooms:
+            self.set_room_state(r, self.__search_state(r))
+        for r in rooms:
+            self.set_room_state(r, state)
+        self.__path = rooms
+
+    def move_robot(self, r: int):
+        if self.__robot is not None:
+            x0, y0, x1, y1 = self.__cell_box(r)
+            self.__canvas.coords(self.__robot, (x0 + x1) // 2, (y0 + y1) // 2 + self.__cell_size // 10)
+
+    def update_from_search(self, search_algorithm):
         """
-        :return: String that contains the elements of the frontier
+        Redraw the rooms that the last expansion of the search changed
         """
-        return self.__frontier.get_frontier_information()
-
+        self.update_expansion(search_algorithm.get_expanded_room(), search_algorithm.get_expanded_path())
 
-    def hamming_distance(self, r1: str):
-        c_coordinate = self.__maze.coordinate(r1)
-        g_coordinate = self.__goal
+    def update_expansion(self, expanded_room: str, path: str = None):
+        """
+        Redraw the rooms that an expansion changed: the expanded room, its neighbors that are pushed to the frontier,
+        and the rooms that enter or leave the expanded path
+        :param path: expanded path as "A-B-C" string, the drawn path is kept when None
+        """
+        if expanded_room == "":
+            return
+        r = self.__maze.room_id(expanded_room)
+        self.count_expansion(r)
+        if path is not None:
+            self.show_path([self.__maze.room_id(name) for name in path.split("-")] if path else [])
+            self.move_robot(r)
 
-        x = abs(g_coordinate[1] - c_coordinate[1])
-        y = abs(g_coordinate[0] - c_coordinate[0])
+    def show_solution(self, search_algorithm):
+        path = search_algorithm.get_solution_path() or []
+        self.show_path([self.__maze.room_id(name) for name in path], "solution")
 
-        goal_room_name = self.__maze.room_name(c_coordinate)
-        current_room_name = self.__maze.room_name(g_coordinate)
-        hamming_distance = sum(c != g for c, g in zip(current_room_name, goal_room_name))
 
-        return x * 2 + y + hamming_distance
+class Search_Worker(threading.Thread):
+    """
+        Runs expand_room() of a search in a background thread, so the Tk loop is never blocked by the search.
+
+        The Tk loop gives the worker a number of steps with allow(). The worker expands that many rooms and puts
+        them to the queue as one batch: tuple(list of expanded rooms, expanded path, expanded cost, frontier snapshot,
+        finished, limit reached). The path, the cost and the frontier are read once per batch, after its last expansion.
+        After skip() the worker runs to the end and posts batches of SKIP_BATCH rooms without the path
+        and the frontier. The search object must not be used by another thread until the finished batch is received.
+        The frontier is posted as a snapshot of its first FRONTIER_LINES paths, see Frontier.get_snapshot().
+        When the search reaches max_expansions the worker posts the frontier and stops as if the search is finished.
+    """
+    SKIP_BATCH = 10000
 
+    __search = None
+    __queue = None
+    __condition = None
+    __budget = None  # steps that are allowed but not expanded yet
+    __skipping = None
+    __stopped = None
+    __max_expansions = None
 
-    def start_search(self):
+    def __init__(self, search_algorithm, max_expansions: int = None):
         """
-            Initialize the search by pushing the start room to frontier
+        :param max_expansions: expansions of the search after which the worker stops, None for no limit
         """
-        tmp_path = str(self.__maze.maze[self.__start[0]][self.__start[1]]) # tuple of the start node
-        tmp_cost = 0 + self.hamming_distance(tmp_path)
-        self.__frontier.add_path((tmp_path, tmp_cost))
-
-    def expand_room(self):
+        super().__init__(daemon=True)
+        self.__search = search_algorithm
+        self.__max_expansions = max_expansions
+        self.__queue = queue.Queue()
+        self.__condition = threading.Condition()
+        self.__budget = 0
+        self.__skipping = False
+        self.__stopped = False
+
+    def get_queue(self):
+        return self.__queue
+
+    def allow(self, steps: int):
+        with self.__condition:
+            self.__budget += steps
+            self.__condition.notify()
+
+    def skip(self):
         """
-        Expand the room from the path that has the lowest cost. Set the solution until the goal is reached or frontier is empty.
-        :return: True if there cannot be no more expand
+        Run the search to the end without waiting for allow()
         """
-        if self.__frontier.get_size() == 0:
-            print("Fringe is empty. Cannot continue to search.")
-            self.__solution = False
-            return True
-
-        expanded_tuple = self.__frontier.remove_path()
-        self.__expanded_path = expanded_tuple[0]
-        self.__expanded_room = self.__expanded_path[-1:]
-        expanded_cost = expanded_tuple[1] - self.hamming_distance(self.__expanded_room)
-        self.__expanded_cost = expanded_tuple[1]
-
-        if self.__maze.coordinate(self.__expanded_room) == self.__goal:
-            self.__solution = expanded_tuple
-            return True
-
-        neighbor_dict = self.__maze.neighbors(self.__expanded_room)
-        if len(neighbor_dict) != 0:
-            for key in neighbor_dict.keys():
-                if len(self.__expanded_path) >= 3:
-                    if key != self.__expanded_path[len(self.__expanded_path) - 3]:  # do not turn back
-                        tmp_path = self.__expanded_path + "-" + key
-                        tmp_cost = expanded_cost + neighbor_dict[key] + self.hamming_distance(key)
-                        self.__frontier.add_path((tmp_path, tmp_cost))
-                else:
-                    tmp_path = self.__expanded_path + "-" + key
-                    tmp_cost = expanded_cost + neighbor_dict[key] + self.hamming_distance(key)
-                    self.__frontier.add_path((tmp_path, tmp_cost))
-
-        self.__frontier.sort_frontier()
-
-
-    def get_solution(self):
-        if not self.__solution:
-            return "Solution cannot be found"
-        else: # solution is set as expanded tuple if the expanded node is equal to goal
-            return "{: <15} :{: <5}".format(self.__solution[0], self.__solution[1])
-
+        with self.__condition:
+            self.__skipping = True
+            self.__condition.notify()
+
+    def stop(self):
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify()
+
+    def run(self):
+        search_algorithm = self.__search
+        while True:
+            with self.__condition:
+                while self.__budget == 0 and not self.__skipping and not self.__stopped:
+                    self.__condition.wait()
+                if self.__stopped:
+                    return
+                skipping = self.__skipping
+                steps = Search_Worker.SKIP_BATCH if skipping else self.__budget
+                self.__budget = 0
+            if self.__max_expansions is not None:
+                steps = min(steps, self.__max_expansions - search_algorithm.get_expansion_count())
+
+            rooms = []
+            finished = False
+            for _ in range(steps):
+                finished = search_algorithm.expand_room()
+                rooms.append(search_algorithm.get_expanded_room())
+                if finished or self.__stopped:
+                    break
+            limit_reached = not finished and self.__max_expansions is not None and \
+                search_algorithm.get_expansion_count() >= self.__max_expansions
+            if skipping and not limit_reached:
+                self.__queue.put((rooms, None, search_algorithm.get_expanded_cost(), None, finished, False))
+            else:
+                self.__queue.put((rooms, search_algorithm.get_expanded_path(), search_algorithm.get_expanded_cost(),
+                                  search_algorithm.frontier_snapshot(FRONTIER_LINES), finished, limit_reached))
+            if finished or limit_reached:
+                return
 
 
 def game_first_page(maze: Maze):
@@ -426,10 +285,7 @@ def game_first_page(maze: Maze):
 
     def initialize_algorithm():
         """Set the search algorithm of the game maze"""
-        if algorithm_var.get() == 0:
-            maze.set_search_algorithm("Uniform Cost Search")
-        else:
-            maze.set_search_algorithm("A* Search")
+        maze.set_search_algorithm(algorithms[algorithm_var.get()])
 
     def initialize_algorithm_page():
         """Destroy the current page"""
@@ -509,10 +365,10 @@ def game_first_page(maze: Maze):
     set_walls_button = Button(master=first_page, text="Set", width=5, command=initialize_walls)
 
     # Create a radiobutton for selecting algorithm
-    algorithms = ["Uniform Cost Search", "A* Search"]
+    algorithms = list(ALGORITHMS)
     algorithm_var = IntVar()
     font_label = font.Font(size=12)
-    for i in range(2):
+    for i in range(len(algorithms)):
         algorithm_radiobutton = Radiobutton(master=first_page, text=algorithms[i], font=font_label, variable=algorithm_var, value=i, command=initialize_algorithm)
         algorithm_radiobutton.place(x=80, y=400+35*i)
 
@@ -546,76 +402,203 @@ def game_first_page(maze: Maze):
     first_page.mainloop()
 
 
-def game_second_page(maze: Maze, search_algorithm):
+def game_second_page(maze: Maze, search_algorithm, step_limit: int = 10, trace=None, expansion_limit: int = TREE_SEARCH_LIMIT):
     """
     :param maze: The maze object that is ready to be applied search algorithms
     :param search_algorithm: The chosen search algorithm object reference from the first page
-
+    :param step_limit: the Next button is disabled after that many steps (tree search may not end), None for no limit.
+    Autoplay has no step limit, it can be paused or skipped to the end.
+    :param expansion_limit: the search is stopped and the goal is reported as not found after that many expansions,
+    None for no limit (a graph search always ends)
+    :param trace: search trace (search_trace.load_trace()) to replay instead of running search_algorithm
+
+    The search runs in a Search_Worker thread. The Next button and the autoplay give it steps, and the expanded
+    rooms it posts are drawn FRAME_MS apart by the Tk loop.
+    A trace is replayed forward and backward: the rows are read from the memory-mapped file only when they are drawn.
     """
-    expand_counter = 1
+    expand_counter = 0
+    playing = False
+    finished = False
+    skipping = False  # replay to the end, SKIP_BATCH rows per frame
+    replay_position = 0  # rows of the trace that are drawn
+    worker = None
+    waiting = False  # the autoplay gave the worker steps and its batch is not drawn yet
+
+    def frontier_text(snapshot):
+        """
+        :param snapshot: frontier snapshot of the search, the long paths are cut from the front
+        """
+        lines = ["Frontier: {} (cost {} - {})".format(snapshot["size"], snapshot["min_cost"], snapshot["max_cost"])
+                 if snapshot["size"] else "Frontier: empty"]
+        for path, cost in snapshot["entries"]:
+            lines.append("{:<8s} ({:d})".format(path if len(path) <= 30 else "..." + path[-27:], cost))
+        if snapshot["size"] > len(snapshot["entries"]):
+            lines.append("... {} more".format(snapshot["size"] - len(snapshot["entries"])))
+        return "\n".join(lines)
 
     def iterate_algorithm():
         """
-        Do the search and update the screen in every step
+        Let the worker do one step, it is drawn by the next frame
         """
-        nonlocal expand_counter
-
-        for r in room_dict.values():
-            r.config(foreground="black", image=delete_image)
-
-        room_dict[maze.get_goal()].config(foreground="red")
-
-        frontier_label.config(text="Frontier:\n" + search_algorithm.frontier_information())
-        step_label.config(text="Step = {}".format(expand_counter))
-        loop_result = search_algorithm.expand_room()
-        expand_counter += 1
-        expanded_path_label.config(text="Expand Path: {} ({})".format(search_algorithm.get_expanded_path(), search_algorithm.get_expanded_cost()))
-        expanded_room_label.config(text="Expand Room: {}".format(search_algorithm.get_expanded_room()))
-
-        for r in search_algorithm.get_expanded_path():
-            if r != "-":
-                room_dict[r].config(foreground="blue", image=image)
-
-        room_dict[search_algorithm.get_expanded_room()].config(foreground="blue", image=image)
-
-        if loop_result:
+        worker.allow(1)
+
+    def play_pause():
+        nonlocal playing
+        playing = not playing
+        play_button.config(text="Pause" if playing else "Play")
+        next_button.config(state=DISABLED if playing or (step_limit is not None and expand_counter >= step_limit) else ACTIVE)
+
+    def skip_to_end():
+        nonlocal playing
+        playing = False
+        worker.skip()
+        for button in (play_button, next_button, skip_button):
+            button.config(state=DISABLED)
+        expanded_path_label.config(text="Searching...")
+
+    def show_batch(rooms, path, cost, frontier_snapshot, search_finished, limit_reached):
+        """
+        Update the screen with the expansions of a batch, the path is drawn only for the last one
+        """
+        nonlocal expand_counter, finished, playing
+        if rooms:
+            for room in rooms[:-1]:
+                maze_canvas.update_expansion(room)
+            room = rooms[-1]
+            maze_canvas.update_expansion(room, path)
+            expand_counter += len(rooms)
+            step_label.config(text="Step = {}".format(expand_counter))
+            if path is not None:
+                expanded_path_label.config(text="Expand Path: {} ({})".format(path, cost))
+            expanded_room_label.config(text="Expand Room: {}".format(room))
+        if frontier_snapshot is not None:
+            frontier_label.config(text=frontier_text(frontier_snapshot))
+
+        if search_finished:
+            finished = True  # the worker is done, the search object can be read here
             if search_algorithm.get_solution() == "Solution cannot be found":
                 expanded_path_label.config(text="Cannot reach to the goal room")
                 expanded_room_label.config(text="Expanded Room: {}".format(search_algorithm.get_expanded_room()))
 
             else:
-                expanded_path_label.config(text="Search Path: {} ({})".format(search_algorithm.get_expanded_path(), search_algorithm.get_expanded_cost()))
-                expanded_room_label.config(text="Goal Room: {}".format(search_algorithm.get_expanded_room()))
-            next_button.config(state=DISABLED)
+                expanded_path_label.config(text="Search Path: {} ({})".format("-".join(search_algorithm.get_solution_path()), search_algorithm.get_solution_cost()))
+                expanded_room_label.config(text="Goal Room: {}".format(search_algorithm.get_goal_room()))
+            for button in (play_button, next_button, skip_button):
+                button.config(state=DISABLED)
+            finish_button.config(state=ACTIVE)
+            maze_canvas.show_solution(search_algorithm)
+
+        elif limit_reached:
+            finished = True  # the worker is stopped, the search is left unfinished
+            playing = False
+            play_button.config(text="Play")
+            expanded_path_label.config(text="Goal Room cannot found in {} expansions".format(expansion_limit))
+            for button in (play_button, next_button, skip_button):
+                button.config(state=DISABLED)
             finish_button.config(state=ACTIVE)
-            sol_path = search_algorithm.get_expanded_path()
-
-            for r in sol_path:
-                if r != "-":
-                    room_dict[r].config(foreground="green")
 
-        elif expand_counter == 10:
+        elif not playing and step_limit is not None and expand_counter >= step_limit:
             expanded_path_label.config(text="Goal Room cannot found")
             next_button.config(state=DISABLED)
             finish_button.config(state=ACTIVE)
 
+    def room_names(rooms):
+        path = "-".join(maze.get_room_name(r) for r in rooms)
+        return path if len(path) <= 60 else "..." + path[-57:]
+
+    def show_replay_row():
+        """
+        Update the labels, the path and the buttons for the last drawn row of the trace
+        """
+        step_label.config(text="Step = {} / {}".format(replay_position, len(trace)))
+        back_button.config(state=DISABLED if replay_position == 0 else ACTIVE)
+        next_button.config(state=DISABLED if replay_position == len(trace) else ACTIVE)
+        if replay_position == 0:
+            maze_canvas.show_path([])
+            expanded_path_label.config(text="Expand Path: ")
+            expanded_room_label.config(text="Expand Room: ")
+            frontier_label.config(text="Frontier: 1")
+            return
+        row = trace[replay_position - 1]
+        room = int(row["room"])
+        path = trace_path(trace, replay_position - 1)
+        frontier_label.config(text="Frontier: {}".format(int(row["frontier_size"])))
+        if replay_position == len(trace) and maze.get_room_name(room) == maze.get_goal():
+            maze_canvas.show_path(path, "solution")
+            expanded_path_label.config(text="Search Path: {} ({})".format(room_names(path), int(row["g"])))
+            expanded_room_label.config(text="Goal Room: {}".format(maze.get_goal()))
+        else:
+            maze_canvas.show_path(path)
+            expanded_path_label.config(text="Expand Path: {} ({})".format(room_names(path), int(row["f"])))
+            expanded_room_label.config(text="Expand Room: {}".format(maze.get_room_name(room)))
+        maze_canvas.move_robot(room)
+
+    def replay_to(position):
+        """
+        Draw the trace up to a row, the expansions between are applied or undone
+        """
+        nonlocal replay_position
+        position = max(0, min(position, len(trace)))
+        if position > replay_position:
+            for room in trace["room"][replay_position:position].tolist():
+                maze_canvas.count_expansion(room)
+        else:
+            for room in reversed(trace["room"][position:replay_position].tolist()):
+                maze_canvas.count_expansion(room, -1)
+        replay_position = position
+        show_replay_row()
+
+    def replay_next():
+        replay_to(replay_position + 1)
+
+    def replay_back():
+        replay_to(replay_position - 1)
+
+    def replay_skip():
+        nonlocal skipping
+        skipping = True
+
+    def draw_frame():
+        """
+        Draw the batches that the worker posted, then give it the steps of the next frame when playing.
+        New steps are given only after the last batch is drawn, so a slow search is never given more than a frame
+        """
+        nonlocal playing, skipping, waiting
+        if trace is not None:
+            if playing or skipping:
+                replay_to(replay_position + (Search_Worker.SKIP_BATCH if skipping else speed_scale.get()))
+                if replay_position == len(trace):
+                    playing = skipping = False
+                    play_button.config(text="Play")
+            second_page.after(FRAME_MS, draw_frame)
+            return
+
+        batches = worker.get_queue()
+        while True:
+            try:
+                batch = batches.get_nowait()
+            except queue.Empty:
+                break
+            waiting = False
+            show_batch(*batch)
+        if finished:
+            return
+        if playing and not waiting:
+            waiting = True
+            worker.allow(speed_scale.get())
+        second_page.after(FRAME_MS, draw_frame)
+
 
     def terminate():
-        """Destroy the current page"""
+        """Stop the worker and destroy the current page"""
+        if worker is not None:
+            worker.stop()
         second_page.destroy()
 
     # create the window of second page
     second_page = Tk()
     second_page.geometry("1000x900")
 
-    # create the image of robot and empty image
-    img = Image.open("Robot.png")
-    resized_image = img.resize((50, 50))
-    image = ImageTk.PhotoImage(resized_image)
-    delete_img = Image.open("delete_image.png")
-    resized_delete_image = delete_img.resize((50, 50))
-    delete_image = ImageTk.PhotoImage(resized_delete_image)
-
     # create a search, start, goal and step labels to be shown through the search
     label_font = font.Font(weight="bold", size=20)
     search_algorithm_label = Label(master=second_page, text=maze.get_search_algorithm(), font=label_font)
@@ -625,136 +608,70 @@ def game_second_page(maze: Maze, search_algorithm):
     label_font2 = font.Font(weight="bold", size=15)
 
     # create a new label to show the frontier information
-    frontier_label = Label(master=second_page, text="Frontier:\n" + search_algorithm.frontier_information(), font=label_font2, padx=8, pady=5)
+    frontier_label = Label(master=second_page, font=label_font2, padx=8, pady=5, justify=LEFT)
 
     # create new labels for expanded room, expanded path and its cost
-    expanded_path_label = Label(master=second_page, text="Expand Path: {} ({})".format(search_algorithm.get_expanded_path(), search_algorithm.get_expanded_cost()), font=label_font2)
-    expanded_room_label = Label(master=second_page, text="Expand room: {}".format(search_algorithm.get_expanded_room()), font=label_font2)
-
-    # now create 9 labels for rooms
-    A_label = Label(master=second_page, text="A", image=delete_image, foreground="black", font=label_font, relief=FLAT, compound="top")
-    B_label = Label(master=second_page, text="B", image=delete_image, foreground="black", font=label_font, relief=FLAT, compound="top")
-    C_label = Label(master=second_page, text="C", image=delete_image, foreground="black", font=label_font, relief=FLAT, compound="top")
-    D_label = Label(master=second_page, text="D", image=delete_image, foreground="black", font=label_font, relief=FLAT, compound="top")
-    E_label = Label(master=second_page, text="E", image=delete_image, foreground="black", font=label_font, relief=FLAT, compound="top")
-    F_label = Label(master=second_page, text="F", image=delete_image, foreground="black", font=label_font, relief=FLAT, compound="top")
-    G_label = Label(master=second_page, text="G", image=delete_image, foreground="black", font=label_font, relief=FLAT, compound="top")
-    H_label = Label(master=second_page, text="H", image=delete_image, foreground="black", font=label_font, relief=FLAT, compound="top")
-    I_label = Label(master=second_page, text="I", image=delete_image, foreground="black", font=label_font, relief=FLAT, compound="top")
-
-    # create 16 labels for walls
-    up_wall = Label(master=second_page, height=1, width=59, relief=FLAT, background="black")
-    right_wall = Label(master=second_page, height=31, width=2, relief=FLAT, background="black")
-    left_wall = Label(master=second_page, height=31, width=2, relief=FLAT, background="black")
-    down_wall = Label(master=second_page, height=1, width=59, relief=FLAT, background="black")
-
-    A_B_Label = Label(master=second_page, height=9, width=2, relief=FLAT)
-    A_D_Label = Label(master=second_page, height=1, width=18, relief=FLAT)
-    B_C_Label = Label(master=second_page, height=9, width=2, relief=FLAT)
-    B_E_Label = Label(master=second_page, height=1, width=18, relief=FLAT)
-    C_F_Label = Label(master=second_page, height=1, width=18, relief=FLAT)
-    D_E_Label = Label(master=second_page, height=9, width=2, relief=FLAT)
-    D_G_Label = Label(master=second_page, height=1, width=18, relief=FLAT)
-    E_F_Label = Label(master=second_page, height=9, width=2, relief=FLAT)
-    E_H_Label = Label(master=second_page, height=1, width=18, relief=FLAT)
-    F_I_Label = Label(master=second_page, height=1, width=18, relief=FLAT)
-    H_I_Label = Label(master=second_page, height=9, width=2, relief=FLAT)
-    G_H_Label = Label(master=second_page, height=9, width=2, relief=FLAT)
-
-    # create next button that executes the search algorithm
-    next_button = Button(master=second_page, text="Next", width=10, height=2, command=iterate_algorithm)
+    expanded_path_label = Label(master=second_page, font=label_font2)
+    expanded_room_label = Label(master=second_page, font=label_font2)
+    if trace is None:
+        frontier_label.config(text=frontier_text(search_algorithm.frontier_snapshot(FRONTIER_LINES)))
+        expanded_path_label.config(text="Expand Path: {} ({})".format(search_algorithm.get_expanded_path(), search_algorithm.get_expanded_cost()))
+        expanded_room_label.config(text="Expand room: {}".format(search_algorithm.get_expanded_room()))
+
+    # draw the rooms and walls once, the steps only recolor the rooms that change
+    maze_canvas = Maze_Canvas(second_page, maze, size=480, robot_image=Image.open("Robot.png"))
+    maze_canvas.draw()
+
+    # create next button that executes the search algorithm, and back button to go back in a replay
+    next_button = Button(master=second_page, text="Next", width=10, height=2, command=iterate_algorithm if trace is None else replay_next)
+    back_button = Button(master=second_page, text="Back", width=10, height=2, command=replay_back)
 
     # create finish button to terminate the program
     finish_button = Button(master=second_page, text="Finish", width=10, height=2, command=terminate)
 
+    # autoplay controls: play or pause, steps drawn per frame, and run the search to the end at once
+    play_button = Button(master=second_page, text="Play", width=10, height=2, command=play_pause)
+    skip_button = Button(master=second_page, text="Skip to End", width=10, height=2, command=skip_to_end if trace is None else replay_skip)
+    speed_scale = Scale(master=second_page, from_=1, to=1000, orient=HORIZONTAL, length=200, label="Steps per frame")
+
     # Packing the labels
     search_algorithm_label.pack(side=TOP)
     start_goal_label.place(x=335, y=76)
     step_label.place(x=450, y=130)
-    frontier_label.place(x=100, y=145)
+    frontier_label.place(x=20, y=145)
     expanded_path_label.place(x=400, y=190)
     expanded_room_label.place(x=400, y=240)
-    up_wall.place(x=285, y=281)
-    down_wall.place(x=287, y=752)
-    left_wall.place(x=283, y=295)
-    right_wall.place(x=685, y=295)
-    A_label.place(x=335, y=305)
-    B_label.place(x=461, y=305)
-    C_label.place(x=587, y=305)
-    D_label.place(x=335, y=458)
-    E_label.place(x=461, y=458)
-    F_label.place(x=587, y=458)
-    G_label.place(x=335, y=611)
-    H_label.place(x=461, y=611)
-    I_label.place(x=587, y=611)
-    A_B_Label.place(x=414, y=302)
-    A_D_Label.place(x=303, y=429)
-    B_C_Label.place(x=546, y=302)
-    B_E_Label.place(x=435, y=429)
-    C_F_Label.place(x=553, y=429)
-    D_E_Label.place(x=414, y=450)
-    D_G_Label.place(x=303, y=590)
-    E_F_Label.place(x=546, y=450)
-    E_H_Label.place(x=435, y=590)
-    F_I_Label.place(x=553, y=590)
-    H_I_Label.place(x=546, y=611)
-    G_H_Label.place(x=414, y=611)
+    maze_canvas.get_canvas().place(x=590 - maze_canvas.get_pixel_width() // 2, y=290)
     next_button.place(x=850, y=800)
+    play_button.place(x=730, y=800)
+    skip_button.place(x=610, y=800)
+    speed_scale.place(x=350, y=790)
     finish_button.place(x=100, y=800)
 
-    # to manage the view of rooms
-    room_dict = {
-        "A": A_label,
-        "B": B_label,
-        "C": C_label,
-        "D": D_label,
-        "E": E_label,
-        "F": F_label,
-        "G": G_label,
-        "H": H_label,
-        "I": I_label
-    }
-
-    # to manage the view of walls
-    walls_dict = {
-        "AB": A_B_Label,
-        "AD": A_D_Label,
-        "BC": B_C_Label,
-        "BE": B_E_Label,
-        "CF": C_F_Label,
-        "DE": D_E_Label,
-        "DG": D_G_Label,
-        "EF": E_F_Label,
-        "EH": E_H_Label,
-        "FI": F_I_Label,
-        "GH": G_H_Label,
-        "HI": H_I_Label
-    }
-
-    # set the root node's color as green and goal nodes red at start
-    room_dict[maze.get_start()].config(foreground="green")
-    room_dict[maze.get_goal()].config(foreground="red")
-
-    # set the walls as black when true
-    maze_walls = maze.get_walls()
-    for key in maze_walls.keys():
-        if maze_walls[key] is True:
-            walls_dict[key].config(background="black")
-
+    if trace is None:
+        worker = Search_Worker(search_algorithm, expansion_limit)
+        worker.start()
+    else:
+        back_button.place(x=850, y=740)
+        show_replay_row()
+    second_page.after(FRAME_MS, draw_frame)
     second_page.mainloop()
+    if worker is not None:
+        worker.stop()
 
 def main():
     game_maze = Maze()
     game_first_page(game_maze)
 
-    if game_maze.get_search_algorithm() == "A* Search":
-        search_algorithm = A_Star_Search(game_maze.get_start(), game_maze.get_goal(), game_maze)
-    else:
+    if game_maze.get_search_algorithm() not in ALGORITHMS:
         game_maze.set_search_algorithm("Uniform Cost Search")
-        search_algorithm = Uniform_Cost_Search(game_maze.get_start(), game_maze.get_goal(), game_maze)
+    search_class = ALGORITHMS[game_maze.get_search_algorithm()]
+    # the page shows the tree search, a bidirectional search is always a graph search
+    search_algorithm = search_class(game_maze.get_start(), game_maze.get_goal(), game_maze, graph_search=issubclass(search_class, Bidirectional_Search))
 
     search_algorithm.start_search()
     game_second_page(game_maze, search_algorithm)
 
 
-main()
+if __name__ == "__main__":
+    main()
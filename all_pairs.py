@@ -0,0 +1,182 @@
+"""
+All-pairs shortest paths of a maze layout, computed once and then walked for any (start, goal) query.
+"""
+import heapq
+import json
+import numpy as np
+from maze_search import Maze, MAX_NEIGHBORS
+from maze_file import metadata_path
+
+UNREACHABLE = -1
+
+FORMAT_NAME = "all-pairs-table"
+FORMAT_VERSION = 1
+
+FLOYD_WARSHALL_MAX_ROOMS = 400  # the vectorized Floyd-Warshall takes rooms^3 steps, Dijkstra is used above that
+
+
+class All_Pairs_Table:
+    """
+        Distance and next-hop tables of every (start, goal) pair of a maze.
+
+        distance[s, g] is the cost of the shortest path from room s to room g and next_hop[s, g] is the room
+        after s on that path (UNREACHABLE when there is no path). A path query walks next_hop in O(path length).
+        The tables are computed with repeated Dijkstra from every room, or with a vectorized Floyd-Warshall
+        on the adjacency matrix for the small mazes.
+    """
+    __layout_key = None
+    __distance = None
+    __next_hop = None
+
+    def __init__(self, distance, next_hop, layout_key=None):
+        self.__distance = distance
+        self.__next_hop = next_hop
+        self.__layout_key = layout_key
+
+    @classmethod
+    def compute(cls, maze: Maze, method: str = None):
+        """
+        :param method: "dijkstra", "floyd-warshall" or None to choose by the size of the maze
+        """
+        if method is None:
+            method = "floyd-warshall" if maze.get_room_count() <= FLOYD_WARSHALL_MAX_ROOMS else "dijkstra"
+        if method == "floyd-warshall":
+            distance, next_hop = floyd_warshall(maze)
+        elif method == "dijkstra":
+            distance, next_hop = repeated_dijkstra(maze)
+        else:
+            raise ValueError("Unknown all-pairs method: {}".format(method))
+        return cls(distance, next_hop, maze.get_layout_key())
+
+    def get_distance_table(self):
+        return self.__distance
+
+    def get_next_hop_table(self):
+        return self.__next_hop
+
+    def get_layout_key(self):
+        return self.__layout_key
+
+    def distance(self, start: int, goal: int):
+        """
+        :return: cost of the shortest path between two rooms given by index, None if there is no path
+        """
+        d = int(self.__distance[start, goal])
+        return None if d == UNREACHABLE else d
+
+    def path(self, start: int, goal: int):
+        """
+        :return: list of the room indexes from start to goal, None if there is no path
+        """
+        if self.__distance[start, goal] == UNREACHABLE:
+            return None
+        rooms = [start]
+        while start != goal:
+            start = int(self.__next_hop[start, goal])
+            rooms.append(start)
+        return rooms
+
+    def save(self, path: str):
+        """
+        Write the tables to a .npy file as one (2, rooms, rooms) integer array: distances, then next hops.
+        The layout of the maze is written to a .json file with the same name, load() checks it
+        """
+        if not path.endswith(".npy"):
+            raise ValueError("An all-pairs table is saved to a .npy file: {}".format(path))
+        if self.__layout_key is None:
+            raise ValueError("The table has no maze layout to save")
+        np.save(path, np.stack([self.__distance, self.__next_hop]))
+        width, height, horizontal_cost, vertical_cost, wall_bytes = self.__layout_key
+        metadata = {
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "width": width,
+            "height": height,
+            "horizontal_cost": horizontal_cost,
+            "vertical_cost": vertical_cost,
+            "walls": wall_bytes.hex()
+        }
+        with open(metadata_path(path), "w") as metadata_file:
+            json.dump(metadata, metadata_file, indent=2)
+
+    @classmethod
+    def load(cls, path: str, maze: Maze = None, mmap_mode: str = None):
+        """
+        :param maze: when given, the tables must be saved for the layout of the maze
+        :param mmap_mode: passed to np.load, e.g. "r" to map the file instead of reading it
+        """
+        if not path.endswith(".npy"):
+            raise ValueError("An all-pairs table is loaded from a .npy file: {}".format(path))
+        with open(metadata_path(path)) as metadata_file:
+            metadata = json.load(metadata_file)
+        if metadata.get("format") != FORMAT_NAME or metadata.get("version") != FORMAT_VERSION:
+            raise ValueError("{} is not an all-pairs table".format(metadata_path(path)))
+        layout_key = (metadata["width"], metadata["height"], metadata["horizontal_cost"], metadata["vertical_cost"],
+                      bytes.fromhex(metadata["walls"]))
+        if maze is not None and maze.get_layout_key() != layout_key:
+            raise ValueError("The table in {} is saved for another maze layout".format(path))
+
+        tables = np.load(path, mmap_mode=mmap_mode)
+        rooms = metadata["width"] * metadata["height"]
+        if tables.shape != (2, rooms, rooms):
+            raise ValueError("{} is not an all-pairs table".format(path))
+        return cls(tables[0], tables[1], layout_key)
+
+def floyd_warshall(maze: Maze):
+    """
+    :return: (distance, next_hop) tables computed on the dense adjacency matrix, rooms^2 memory
+    """
+    n = maze.get_room_count()
+    neighbor_index, neighbor_cost, degree = maze.get_adjacency_arrays()
+    has_edge = np.arange(MAX_NEIGHBORS) < degree[:, None]
+    sources = np.repeat(np.arange(n), MAX_NEIGHBORS).reshape(n, MAX_NEIGHBORS)[has_edge]
+    targets = neighbor_index[has_edge]
+
+    distance = np.full((n, n), np.inf)
+    distance[sources, targets] = neighbor_cost[has_edge]
+    np.fill_diagonal(distance, 0)
+    next_hop = np.full((n, n), UNREACHABLE, dtype=np.int32)
+    next_hop[sources, targets] = targets
+    next_hop[np.arange(n), np.arange(n)] = np.arange(n)
+
+    for k in range(n):
+        through_k = distance[:, k:k + 1] + distance[k:k + 1, :]
+        shorter = through_k < distance
+        distance = np.where(shorter, through_k, distance)
+        next_hop = np.where(shorter, next_hop[:, k:k + 1], next_hop)
+
+    distance = np.where(np.isinf(distance), UNREACHABLE, distance).astype(np.int32)
+    return distance, next_hop
+
+
+def repeated_dijkstra(maze: Maze):
+    """
+    :return: (distance, next_hop) tables, one Dijkstra run from every room on the adjacency arrays
+    """
+    n = maze.get_room_count()
+    neighbor_index, neighbor_cost, degree = maze.get_adjacency()
+    distance = np.full((n, n), UNREACHABLE, dtype=np.int32)
+    next_hop = np.full((n, n), UNREACHABLE, dtype=np.int32)
+
+    for source in range(n):
+        best = {source: 0}
+        first_step = {source: source}
+        settled = set()
+        heap = [(0, source)]
+        while heap:
+            d, room = heapq.heappop(heap)
+            if room in settled:
+                continue
+            settled.add(room)
+            base = room * MAX_NEIGHBORS
+            for k in range(base, base + degree[room]):
+                child = neighbor_index[k]
+                child_distance = d + neighbor_cost[k]
+                if child not in settled and child_distance < best.get(child, child_distance + 1):
+                    best[child] = child_distance
+                    first_step[child] = child if room == source else first_step[room]
+                    heapq.heappush(heap, (child_distance, child))
+        rooms = np.fromiter(best.keys(), dtype=np.int64, count=len(best))
+        distance[source, rooms] = np.fromiter(best.values(), dtype=np.int32, count=len(best))
+        next_hop[source, rooms] = np.fromiter((first_step[r] for r in best), dtype=np.int32, count=len(best))
+    return distance, next_hop
@@ -0,0 +1,202 @@
+"""
+Benchmarks of the search engines on seeded maze corpora, written as JSON to compare the numbers across commits.
+
+    python -m benchmark --out bench.json
+    python -m benchmark --quick            # skip the 1000x1000 mazes
+
+For every maze and algorithm it records the full solve time (best of the repeats), the per-expansion latency
+(mean, median and 99th percentile of the expand_room() calls), the peak frontier size and the peak memory
+measured with tracemalloc in a separate run. The Frontier push/pop cost is measured on its own as well.
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+import numpy as np
+from maze_search import Maze, Frontier
+from maze_generator import generate_maze
+from solver import ALGORITHMS, algorithm_name, create_search
+
+# IDA* expands the rooms of a perfect maze again in every iteration (about 20M expansions at 300x300),
+# so it only runs when it is asked for and then stops at IDA_STAR_MAX_EXPANSIONS unless another cap is given
+DEFAULT_ALGORITHMS = [name for name in ALGORITHMS if name != "IDA* Search"]
+IDA_STAR_MAX_EXPANSIONS = 200000
+
+
+def run_search(search_algorithm, max_expansions: int = None):
+    """
+    :return: True if the search ended, False if it was stopped after max_expansions expansions
+    """
+    while not search_algorithm.expand_room():
+        if max_expansions is not None and search_algorithm.get_expansion_count() >= max_expansions:
+            return False
+    return True
+
+
+def make_corpus(seed: int = 0, quick: bool = False):
+    """
+    :return: list of (name, maze, start room, goal room) that is the same for the same seed
+    """
+    corpus = []
+    classic = Maze()
+    corpus.append(("classic 3x3", classic, "A", "I"))
+    classic_walls = Maze()
+    classic_walls.set_walls(["A-B", "D-E", "E-H", "F-I"])
+    corpus.append(("classic 3x3 with walls", classic_walls, "A", "I"))
+
+    sizes = [100] if quick else [100, 1000]
+    for size in sizes:
+        corpus.append(("open {0}x{0}".format(size), Maze(size, size), None, None))
+        corpus.append(("random 20% walls {0}x{0}".format(size), generate_maze(size, size, "random", seed, density=0.2), None, None))
+        corpus.append(("corridors {0}x{0}".format(size), generate_maze(size, size, "binary-tree", seed), None, None))
+        corpus.append(("perfect {0}x{0}".format(size), generate_maze(size, size, "perfect", seed), None, None))
+        corpus.append(("rooms {0}x{0}".format(size), generate_maze(size, size, "rooms", seed), None, None))
+
+    # the large mazes go from the top left room to the bottom right room
+    return [(name, maze, start or maze.get_room_name(0), goal or maze.get_room_name(maze.get_room_count() - 1))
+            for name, maze, start, goal in corpus]
+
+
+def time_solve(algorithm: str, start: str, goal: str, maze: Maze, max_expansions: int = None):
+    """
+    :return: seconds to run the search to the end or to max_expansions expansions
+    """
+    begin = time.perf_counter()
+    search_algorithm = create_search(algorithm, start, goal, maze)
+    run_search(search_algorithm, max_expansions)
+    return time.perf_counter() - begin
+
+
+def expansion_latencies(algorithm: str, start: str, goal: str, maze: Maze, max_expansions: int = None):
+    """
+    :return: tuple(search object after the search, array of the nanoseconds that every expand_room() call took,
+    True if the search ended before max_expansions expansions)
+    """
+    search_algorithm = create_search(algorithm, start, goal, maze)
+    latencies = []
+    clock = time.perf_counter_ns
+    while True:
+        begin = clock()
+        done = search_algorithm.expand_room()
+        latencies.append(clock() - begin)
+        if done:
+            break
+        if max_expansions is not None and search_algorithm.get_expansion_count() >= max_expansions:
+            break
+    return search_algorithm, np.array(latencies, dtype=np.int64), bool(done)
+
+
+def peak_memory(algorithm: str, start: str, goal: str, maze: Maze, max_expansions: int = None):
+    """
+    :return: peak bytes allocated by the search, the adjacency arrays are built before the measure
+    """
+    maze.get_adjacency()
+    tracemalloc.start()
+    try:
+        search_algorithm = create_search(algorithm, start, goal, maze)
+        run_search(search_algorithm, max_expansions)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_search(name: str, maze: Maze, start: str, goal: str, algorithm: str, repeat: int, max_expansions: int = None):
+    """
+    :param max_expansions: the searches stop after that many expansions, the times are then of the partial search
+    """
+    if algorithm == "IDA* Search" and max_expansions is None:
+        max_expansions = IDA_STAR_MAX_EXPANSIONS
+    maze.get_adjacency()  # measure the searches, not the first build of the index
+    solve_seconds = min(time_solve(algorithm, start, goal, maze, max_expansions) for _ in range(repeat))
+    search_algorithm, latencies, finished = expansion_latencies(algorithm, start, goal, maze, max_expansions)
+    return {
+        "maze": name,
+        "algorithm": algorithm,
+        "rooms": maze.get_room_count(),
+        "max_expansions": max_expansions,
+        "finished": finished,
+        "cost": search_algorithm.get_solution_cost(),
+        "expansions": search_algorithm.get_expansion_count(),
+        "solve_seconds": solve_seconds,
+        "expansion_ns_mean": float(latencies.mean()),
+        "expansion_ns_median": float(np.median(latencies)),
+        "expansion_ns_p99": float(np.percentile(latencies, 99)),
+        "frontier_peak": search_algorithm.get_frontier_peak(),
+        "peak_memory_bytes": peak_memory(algorithm, start, goal, maze, max_expansions)
+    }
+
+
+def benchmark_frontier(size: int, seed: int, repeat: int):
+    """
+    :return: nanoseconds per push and per pop of a Frontier holding size paths with random costs
+    """
+    rng = random.Random(seed)
+    costs = [rng.randrange(size) for _ in range(size)]
+    push_seconds = pop_seconds = float("inf")
+    for _ in range(repeat):
+        frontier = Frontier()
+        begin = time.perf_counter()
+        for node, cost in enumerate(costs):
+            frontier.add_path((node, cost), node)
+        push_seconds = min(push_seconds, time.perf_counter() - begin)
+        begin = time.perf_counter()
+        while frontier.get_size():
+            frontier.remove_path()
+        pop_seconds = min(pop_seconds, time.perf_counter() - begin)
+    return {"size": size, "push_ns": push_seconds / size * 1e9, "pop_ns": pop_seconds / size * 1e9}
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(seed: int = 0, quick: bool = False, repeat: int = 3, algorithms=None, max_expansions: int = None):
+    """
+    :param algorithms: names of the algorithms, DEFAULT_ALGORITHMS when not given
+    :param max_expansions: expansion cap of every search, IDA* has IDA_STAR_MAX_EXPANSIONS when not given
+    :return: dictionary of the results, ready to be written as JSON
+    """
+    algorithms = [algorithm_name(name) for name in (algorithms or DEFAULT_ALGORITHMS)]
+    results = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "seed": seed,
+        "max_expansions": max_expansions,
+        "searches": [],
+        "frontier": [benchmark_frontier(size, seed, repeat) for size in (1000, 100000)]
+    }
+    for name, maze, start, goal in make_corpus(seed, quick):
+        for algorithm in algorithms:
+            results["searches"].append(benchmark_search(name, maze, start, goal, algorithm, repeat, max_expansions))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmark", description="Benchmark the search engines")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="the best time of that many solves is kept")
+    parser.add_argument("--quick", action="store_true", help="skip the 1000x1000 mazes")
+    parser.add_argument("--algorithms", default=None, help="comma separated algorithms, all but IDA* by default")
+    parser.add_argument("--max-expansions", type=int, default=None,
+                        help="stop every search after that many expansions (IDA* stops at {} by default)".format(IDA_STAR_MAX_EXPANSIONS))
+    parser.add_argument("--out", default=None, help="JSON file to write the results, printed when not given")
+    args = parser.parse_args(argv)
+
+    algorithms = args.algorithms.split(",") if args.algorithms else None
+    results = run_benchmarks(args.seed, args.quick, args.repeat, algorithms, args.max_expansions)
+    if args.out is None:
+        print(json.dumps(results, indent=2))
+    else:
+        with open(args.out, "w") as out_file:
+            json.dump(results, out_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Maze files: an ASCII grid for humans and a binary .npy form for large mazes.
+
+The ASCII grid has 2 * height + 1 lines of 2 * width + 1 characters. Room (row, column) is the character at
+(2 * row + 1, 2 * column + 1): "S" for the start room, "G" for the goal room and a space otherwise. The character
+on its right is "|" when there is a wall, the character below is "-" when there is a wall, and the other characters
+are "+" corners and the outer walls. The move costs and the start and goal rooms are given in "# key: value" lines
+before the grid, the marks are used when a file has no start or goal line:
+
+    # horizontal_cost: 2
+    # vertical_cost: 1
+    # start: A
+    # goal: I
+    +-+-+-+
+    |S|   |
+    + + + +
+    |     |
+    + +-+ +
+    |    G|
+    +-+-+-+
+
+The binary form is a .npy file of the two wall bitboards of the maze (shape (2, height, words), see
+Maze.get_bitboards()) and a .json file with the same name that holds the size, the costs, the start and the goal.
+Both forms are read with np.memmap / np.load(mmap_mode="r"), so a large maze is never read into Python objects.
+"""
+import json
+import os
+import numpy as np
+from maze_search import Maze
+
+FORMAT_NAME = "maze-bitboards"
+FORMAT_VERSION = 1
+
+ROOM_BLOCK = 1024  # rows of rooms that are converted at once when an ASCII grid is written
+
+
+def metadata_path(path: str):
+    """
+    :return: path of the .json file of a binary maze file
+    """
+    return os.path.splitext(path)[0] + ".json"
+
+
+def save_maze(maze: Maze, path: str):
+    """
+    Write the maze as a binary maze when the path ends with .npy, as an ASCII grid otherwise
+    """
+    if path.endswith(".npy"):
+        save_binary_maze(maze, path)
+    else:
+        save_ascii_maze(maze, path)
+
+
+def load_maze(path: str):
+    """
+    Read a maze written by save_maze(), the start and goal rooms are set on the maze when the file has them
+    """
+    if path.endswith(".npy"):
+        return load_binary_maze(path)
+    return load_ascii_maze(path)
+
+
+def save_binary_maze(maze: Maze, path: str):
+    horizontal_walls, vertical_walls = maze.get_bitboards()
+    np.save(path, np.stack([horizontal_walls, vertical_walls]))
+    metadata = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "width": maze.get_width(),
+        "height": maze.get_height(),
+        "horizontal_cost": maze.get_horizontal_cost(),
+        "vertical_cost": maze.get_vertical_cost(),
+        "start": maze.get_start() or None,
+        "goal": maze.get_goal() or None
+    }
+    with open(metadata_path(path), "w") as metadata_file:
+        json.dump(metadata, metadata_file, indent=2)
+
+
+def load_binary_maze(path: str):
+    with open(metadata_path(path)) as metadata_file:
+        metadata = json.load(metadata_file)
+    if metadata.get("format") != FORMAT_NAME or metadata.get("version") != FORMAT_VERSION:
+        raise ValueError("{} is not a maze file".format(metadata_path(path)))
+
+    maze = Maze(metadata["width"], metadata["height"], metadata["horizontal_cost"], metadata["vertical_cost"])
+    bitboards = np.load(path, mmap_mode="r")
+    words = (maze.get_width() + 63) // 64
+    if bitboards.shape != (2, maze.get_height(), words):
+        raise ValueError("The walls in {} do not match the maze size".format(path))
+    maze.set_bitboards(bitboards[0], bitboards[1])
+    if metadata.get("start") is not None:
+        maze.set_start(metadata["start"])
+    if metadata.get("goal") is not None:
+        maze.set_goal(metadata["goal"])
+    return maze
+
+
+def save_ascii_maze(maze: Maze, path: str):
+    """
+    Write the ASCII grid ROOM_BLOCK rows of rooms at a time
+    """
+    width, height = maze.get_width(), maze.get_height()
+    start = maze.room_id(maze.get_start()) if maze.get_start() else -1
+    goal = maze.room_id(maze.get_goal()) if maze.get_goal() else -1
+    horizontal_bitboard, vertical_bitboard = maze.get_bitboards()
+
+    with open(path, "wb") as maze_file:
+        maze_file.write("# horizontal_cost: {}\n# vertical_cost: {}\n".format(maze.get_horizontal_cost(), maze.get_vertical_cost()).encode())
+        for key, room in (("start", maze.get_start()), ("goal", maze.get_goal())):
+            if room:
+                maze_file.write("# {}: {}\n".format(key, room).encode())  # the marks alone are lost when start == goal
+        border = np.full(2 * width + 2, ord("-"), dtype=np.uint8)
+        border[0::2] = ord("+")
+        border[-1] = ord("\n")
+        maze_file.write(border.tobytes())
+
+        for first_row in range(0, height, ROOM_BLOCK):
+            rows = min(ROOM_BLOCK, height - first_row)
+            horizontal_walls = unpack_rows(horizontal_bitboard[first_row:first_row + rows], width)
+            vertical_walls = unpack_rows(vertical_bitboard[first_row:first_row + rows], width)
+            if first_row + rows == height:
+                vertical_walls[-1, :] = True  # the bottom border
+
+            lines = np.full((rows, 2, 2 * width + 2), ord(" "), dtype=np.uint8)
+            lines[:, :, -1] = ord("\n")
+            lines[:, 0, 0] = ord("|")
+            lines[:, 0, 2:-1:2] = np.where(horizontal_walls, ord("|"), ord(" "))
+            lines[:, 0, -2] = ord("|")
+            lines[:, 1, 0:-1:2] = ord("+")
+            lines[:, 1, 1:-1:2] = np.where(vertical_walls, ord("-"), ord(" "))
+
+            rooms = lines[:, 0, 1:-1:2].reshape(-1)
+            for room, mark in ((start, "S"), (goal, "G")):
+                if first_row * width <= room < (first_row + rows) * width:
+                    rooms[room - first_row * width] = ord(mark)
+            lines[:, 0, 1:-1:2] = rooms.reshape(rows, width)
+            maze_file.write(lines.tobytes())
+
+
+def unpack_rows(bitboard, width: int):
+    """
+    :return: (rows, width) boolean array of the bits of bitboard rows
+    """
+    return np.unpackbits(np.ascontiguousarray(bitboard).view(np.uint8), axis=1, bitorder="little")[:, :width].astype(bool)
+
+
+def load_ascii_maze(path: str):
+    """
+    Read the "# key: value" lines, then map the grid lines and take the walls and the marks with array slicing
+    """
+    metadata = {}
+    offset = 0
+    with open(path, "rb") as maze_file:
+        for line in maze_file:
+            if not line.startswith(b"#"):
+                line_length = len(line)
+                break
+            key, _, value = line[1:].decode().partition(":")
+            metadata[key.strip()] = value.strip()
+            offset += len(line)
+        else:
+            raise ValueError("{} has no maze grid".format(path))
+
+    grid = np.memmap(path, dtype=np.uint8, mode="r", offset=offset)
+    if len(grid) % line_length != 0:
+        grid = np.concatenate([grid, np.full(line_length - len(grid) % line_length, ord("\n"), dtype=np.uint8)])  # no last newline
+    grid = grid.reshape(-1, line_length)
+    columns = len(grid[0].tobytes().rstrip(b"\r\n"))
+    width, height = (columns - 1) // 2, (len(grid) - 1) // 2
+    if width < 1 or height < 1 or columns != 2 * width + 1 or len(grid) != 2 * height + 1:
+        raise ValueError("{} is not a maze grid".format(path))
+
+    maze = Maze(width, height, int(metadata.get("horizontal_cost", 2)), int(metadata.get("vertical_cost", 1)))
+    rooms = grid[1::2, 1:columns:2]
+    maze.set_wall_arrays(grid[1::2, 2:columns - 1:2] == ord("|"), grid[2:-1:2, 1:columns:2] == ord("-"))
+
+    for key, mark, set_room in (("start", "S", maze.set_start), ("goal", "G", maze.set_goal)):
+        if key in metadata:
+            set_room(metadata[key])
+        else:
+            found = np.flatnonzero(rooms == ord(mark))
+            if len(found) != 0:
+                set_room(maze.get_room_name(int(found[0])))
+    return maze
@@ -0,0 +1,264 @@
+"""
+Seeded random mazes for the load tests, the wall arrays are built with NumPy so a 2000x2000 maze takes seconds.
+
+    maze = generate_maze(2000, 2000, "perfect", seed=1)
+    python -m maze_generator --size 2000x2000 --style rooms --seed 1 --out maze.npy
+    python -m maze_generator --size 200x200 --count 1000 --seed 1 --out mazes.npy   # streamed in batches
+
+Styles:
+    perfect      a single path between any two rooms (random spanning tree, see perfect_walls())
+    random       a wall at every edge with the probability density
+    rooms        open rectangular rooms joined by the corridors of a perfect maze
+    binary-tree  a perfect maze where every room opens up or left (long corridors along the top row and the left column)
+
+The same seed always gives the same maze. Maze i of a batch is the maze of the seed (seed, i),
+so any maze of a batch can be generated again on its own.
+"""
+import argparse
+import json
+import numpy as np
+from maze_search import Maze
+from maze_file import metadata_path, save_maze
+from solver import parse_size
+
+BATCH_FORMAT_NAME = "maze-bitboards-batch"
+BATCH_FORMAT_VERSION = 1
+
+
+def edge_rooms(width: int, height: int):
+    """
+    :return: tuple(first room, second room) arrays of all the edges, the horizontal edges in row-major order
+    followed by the vertical edges in row-major order (the order of the wall arrays)
+    """
+    ids = np.arange(width * height, dtype=np.int64).reshape(height, width)
+    first = np.concatenate([ids[:, :-1].ravel(), ids[:-1, :].ravel()])
+    second = np.concatenate([ids[:, 1:].ravel(), ids[1:, :].ravel()])
+    return first, second
+
+
+def split_edges(edges, width: int, height: int):
+    """
+    :param edges: boolean array of all the edges in the order of edge_rooms()
+    :return: tuple(horizontal, vertical) arrays of shapes (height, width - 1) and (height - 1, width)
+    """
+    horizontal_count = height * (width - 1)
+    return edges[:horizontal_count].reshape(height, width - 1), edges[horizontal_count:].reshape(height - 1, width)
+
+
+def perfect_walls(width: int, height: int, rng):
+    """
+    Randomized Kruskal and randomized Prim both build the minimum spanning tree of random edge weights.
+    The same tree is built here with Boruvka rounds, which are whole-array operations: every component takes
+    its lightest edge to another component, then the components are merged by pointer jumping.
+    The number of components at least halves in every round, so there are at most log2(rooms) rounds.
+
+    :return: tuple(horizontal walls, vertical walls) that leave exactly one path between any two rooms
+    """
+    first, second = edge_rooms(width, height)
+    order = rng.permutation(len(first))  # edge order = weight, all weights are different
+    first, second = first[order], second[order]
+    edges = np.arange(len(first), dtype=np.int64)
+    in_tree = np.zeros(len(first), dtype=bool)
+    component = np.arange(width * height, dtype=np.int64)
+
+    while len(edges):
+        first_component, second_component = component[first], component[second]
+        crossing = first_component != second_component
+        edges, first, second = edges[crossing], first[crossing], second[crossing]
+        first_component, second_component = first_component[crossing], second_component[crossing]
+        if not len(edges):
+            break
+
+        lightest = np.full(width * height, len(order), dtype=np.int64)
+        np.minimum.at(lightest, first_component, np.arange(len(edges)))
+        np.minimum.at(lightest, second_component, np.arange(len(edges)))
+        roots = np.flatnonzero(lightest != len(order))
+        chosen = lightest[roots]
+        in_tree[edges[chosen]] = True
+
+        # every component points to the other end of its lightest edge, two components that chose the same edge
+        # point to each other and the smaller one becomes the root of the merged component
+        pointer = np.arange(width * height, dtype=np.int64)
+        pointer[roots] = np.where(first_component[chosen] == roots, second_component[chosen], first_component[chosen])
+        targets = pointer[roots]
+        pair_roots = roots[(pointer[targets] == roots) & (roots < targets)]
+        pointer[pair_roots] = pair_roots
+        while True:
+            jumped = pointer[pointer]
+            if np.array_equal(jumped, pointer):
+                break
+            pointer = jumped
+        component = pointer[component]
+
+    walls = np.ones(len(order), dtype=bool)
+    walls[order[in_tree]] = False
+    return split_edges(walls, width, height)
+
+
+def random_walls(width: int, height: int, rng, density: float = 0.2):
+    """
+    :return: tuple(horizontal walls, vertical walls) that have a wall at every edge with the probability of density
+    """
+    return rng.random((height, width - 1)) < density, rng.random((height - 1, width)) < density
+
+
+def rooms_walls(width: int, height: int, rng, room_count: int = None, min_room: int = 2, max_room: int = 8):
+    """
+    Open room_count rectangles of min_room to max_room rooms per side in a perfect maze, the rectangles
+    can overlap. One room per max_room * max_room rooms of the maze when room_count is not given.
+
+    :return: tuple(horizontal walls, vertical walls)
+    """
+    horizontal_walls, vertical_walls = perfect_walls(width, height, rng)
+    if room_count is None:
+        room_count = max(1, width * height // (max_room * max_room))
+    heights = np.minimum(rng.integers(min_room, max_room + 1, room_count), height)
+    widths = np.minimum(rng.integers(min_room, max_room + 1, room_count), width)
+    tops = rng.integers(0, height - heights + 1)
+    lefts = rng.integers(0, width - widths + 1)
+
+    # count the rectangles over every room with a 2D difference array
+    cover = np.zeros((height + 1, width + 1), dtype=np.int32)
+    np.add.at(cover, (tops, lefts), 1)
+    np.add.at(cover, (tops + heights, lefts), -1)
+    np.add.at(cover, (tops, lefts + widths), -1)
+    np.add.at(cover, (tops + heights, lefts + widths), 1)
+    covered = cover.cumsum(axis=0).cumsum(axis=1)[:height, :width] > 0
+
+    horizontal_walls &= ~(covered[:, :-1] & covered[:, 1:])
+    vertical_walls &= ~(covered[:-1, :] & covered[1:, :])
+    return horizontal_walls, vertical_walls
+
+
+def binary_tree_walls(width: int, height: int, rng):
+    """
+    :return: tuple(horizontal walls, vertical walls) of a perfect maze where every room opens either up or left,
+    so the rooms are connected by long corridors
+    """
+    open_up = rng.random((height, width)) < 0.5
+    open_up[0, :] = False  # the first row can only open to the left
+    open_up[:, 0] = True  # the first column can only open up
+    open_left = ~open_up
+    return ~open_left[:, 1:], ~open_up[1:, :]
+
+
+STYLES = {
+    "perfect": perfect_walls,
+    "random": random_walls,
+    "rooms": rooms_walls,
+    "binary-tree": binary_tree_walls
+}
+
+
+def generate_walls(width: int, height: int, style: str = "perfect", seed=None, **options):
+    """
+    :param seed: anything np.random.default_rng() takes, None for a different maze every time
+    :param options: options of the style (density of random_walls, room_count, min_room and max_room of rooms_walls)
+    :return: tuple(horizontal walls, vertical walls) boolean arrays of shapes (height, width - 1) and (height - 1, width)
+    """
+    if style not in STYLES:
+        raise ValueError("Unknown maze style {}, the styles are {}".format(style, ", ".join(STYLES)))
+    return STYLES[style](width, height, np.random.default_rng(seed), **options)
+
+
+def generate_maze(width: int, height: int, style: str = "perfect", seed=None, horizontal_cost: int = 2, vertical_cost: int = 1,
+                  **options):
+    """
+    :return: Maze with the walls of generate_walls()
+    """
+    maze = Maze(width, height, horizontal_cost, vertical_cost)
+    maze.set_wall_arrays(*generate_walls(width, height, style, seed, **options))
+    return maze
+
+
+def generate_batch(count: int, width: int, height: int, style: str = "perfect", seed: int = 0, first: int = 0, **options):
+    """
+    :param first: index of the first maze of the batch
+    :return: tuple(horizontal walls, vertical walls) stacked as (count, height, width - 1) and (count, height - 1, width)
+    arrays, ready for wavefront.batch_distances()
+    """
+    walls = [generate_walls(width, height, style, (seed, first + i), **options) for i in range(count)]
+    return np.stack([horizontal for horizontal, _ in walls]), np.stack([vertical for _, vertical in walls])
+
+
+def save_batches(path: str, count: int, width: int, height: int, style: str = "perfect", seed: int = 0, batch_size: int = 64,
+                 horizontal_cost: int = 2, vertical_cost: int = 1, **options):
+    """
+    Write count mazes as one .npy file of (count, 2, height, words) bitboards (see Maze.get_bitboards()) and a .json file
+    with the same name. The file is filled batch_size mazes at a time, so the mazes are never all in memory.
+    """
+    maze = Maze(width, height, horizontal_cost, vertical_cost)
+    words = maze.get_bitboards()[0].shape[1]
+    bitboards = np.lib.format.open_memmap(path, mode="w+", dtype="<u8", shape=(count, 2, height, words))
+    for first in range(0, count, batch_size):
+        horizontal_walls, vertical_walls = generate_batch(min(batch_size, count - first), width, height, style, seed, first, **options)
+        for i in range(len(horizontal_walls)):
+            maze.set_wall_arrays(horizontal_walls[i], vertical_walls[i])
+            bitboards[first + i] = maze.get_bitboards()
+        bitboards.flush()
+    del bitboards
+
+    metadata = {
+        "format": BATCH_FORMAT_NAME,
+        "version": BATCH_FORMAT_VERSION,
+        "count": count,
+        "width": width,
+        "height": height,
+        "horizontal_cost": horizontal_cost,
+        "vertical_cost": vertical_cost,
+        "style": style,
+        "seed": seed,
+        "options": options
+    }
+    with open(metadata_path(path), "w") as metadata_file:
+        json.dump(metadata, metadata_file, indent=2)
+
+
+def load_batch_maze(path: str, index: int):
+    """
+    :return: maze number index of a file written by save_batches(), only its walls are read from the file
+    """
+    with open(metadata_path(path)) as metadata_file:
+        metadata = json.load(metadata_file)
+    if metadata.get("format") != BATCH_FORMAT_NAME or metadata.get("version") != BATCH_FORMAT_VERSION:
+        raise ValueError("{} is not a maze batch file".format(metadata_path(path)))
+    if not 0 <= index < metadata["count"]:
+        raise ValueError("Maze {} is not in {}".format(index, path))
+
+    bitboards = np.load(path, mmap_mode="r")
+    maze = Maze(metadata["width"], metadata["height"], metadata["horizontal_cost"], metadata["vertical_cost"])
+    maze.set_bitboards(bitboards[index, 0], bitboards[index, 1])
+    return maze
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m maze_generator", description="Generate seeded random mazes")
+    parser.add_argument("--size", default="100x100", help="WIDTHxHEIGHT of the mazes (default 100x100)")
+    parser.add_argument("--style", default="perfect", choices=list(STYLES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--density", type=float, default=None, help="wall probability of the random style")
+    parser.add_argument("--count", type=int, default=None, help="write that many mazes to one batch file")
+    parser.add_argument("--batch-size", type=int, default=64, help="mazes generated at once for --count")
+    parser.add_argument("--horizontal-cost", type=int, default=2)
+    parser.add_argument("--vertical-cost", type=int, default=1)
+    parser.add_argument("--out", required=True, help="maze file (ASCII grid or .npy), a .npy file with --count")
+    args = parser.parse_args(argv)
+
+    width, height = parse_size(args.size)
+    if args.density is not None and args.style != "random":
+        parser.error("--density is an option of the random style")
+    options = {"density": args.density} if args.density is not None else {}
+    if args.count is not None:
+        if not args.out.endswith(".npy"):
+            parser.error("--count writes a .npy file")
+        save_batches(args.out, args.count, width, height, args.style, args.seed, args.batch_size,
+                     args.horizontal_cost, args.vertical_cost, **options)
+        return
+    maze = generate_maze(width, height, args.style, args.seed, args.horizontal_cost, args.vertical_cost, **options)
+    maze.set_start(maze.get_room_name(0))
+    maze.set_goal(maze.get_room_name(maze.get_room_count() - 1))
+    save_maze(maze, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1818 @@
+import heapq
+import logging
+from array import array
+from time import perf_counter_ns
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAX_NEIGHBORS = 4  # a room of a grid has up, down, right and left neighbors at most
+
+WORD_BITS = 64  # rooms per word of a bitboard row
+
+INFINITY = float("inf")
+
+
+class Maze:
+    """
+        A grid of rooms of any width and height. Rooms are addressed by integer index (row * width + column)
+        and by name. Walls are kept in two bitboards, one bit per room in rows of packed 64-bit words
+        (a single word per row up to 64 columns, bit j of word j // 64 is column j):
+        horizontal walls block the moves between (row, column) and (row, column + 1),
+        vertical walls block the moves between (row, column) and (row + 1, column)
+        The boolean arrays, the wall dictionary and the wall mask are built from the bitboards when they are asked.
+
+        Room names are kept in two tables (index -> name and name -> index) when they are letters; above 26 rooms
+        a room is named by its index, so the names are computed and a large maze holds no Python object per room.
+        The coordinate of a room is computed from its index, so all lookups between names, indexes and coordinates
+        are constant time.
+
+        The open neighbors of the rooms are indexed in CSR-style adjacency arrays: the neighbors of room r are
+        neighbor_index[r * MAX_NEIGHBORS: r * MAX_NEIGHBORS + degree[r]] (up, down, right, left order)
+        with the move costs at the same positions of neighbor_cost. Every room has a fixed row capacity,
+        so changing a wall only rewrites the rows of the two rooms it separates.
+    """
+    __width = None
+    __height = None
+    __horizontal_walls = None  # bitboard, bit of (row, column) is set if the room has a wall on its right
+    __vertical_walls = None  # bitboard, bit of (row, column) is set if the room has a wall below
+    __words = None  # words per bitboard row
+    __horizontal_cost = None
+    __vertical_cost = None
+    __neighbor_index = None
+    __neighbor_cost = None
+    __degree = None
+    __adjacency_valid = None
+    __room_names = None  # room index -> name, None when the rooms are named by index
+    __room_ids = None  # room name -> index, built when a name is first looked up
+    __room_grid = None  # (height, width) array of the names, built when it is first used
+    __layout_key = None
+    __wall_listeners = None
+    __start = None # name of the room
+    __goal = None # name of the room
+    __search_algorithm = None
+
+    def __init__(self, width: int = 3, height: int = 3, horizontal_cost: int = 2, vertical_cost: int = 1):
+        self.__width = width
+        self.__height = height
+        self.__horizontal_cost = horizontal_cost
+        self.__vertical_cost = vertical_cost
+        if width * height <= 26:
+            self.__room_names = [Maze.default_room_name(i, width * height) for i in range(width * height)]
+        self.__words = (width + WORD_BITS - 1) // WORD_BITS
+        self.__horizontal_walls = np.zeros((height, self.__words), dtype="<u8")
+        self.__vertical_walls = np.zeros((height, self.__words), dtype="<u8")
+        self.__adjacency_valid = False
+        self.__wall_listeners = []
+        self.__start = ""
+        self.__goal = ""
+        self.__search_algorithm = ""
+
+    @staticmethod
+    def default_room_name(index: int, room_count: int):
+        """
+        Rooms are named with letters (A, B, C...) when they fit in the alphabet, else with their index
+        """
+        if room_count <= 26:
+            return chr(ord("A") + index)
+        return str(index)
+
+    @property
+    def maze(self):
+        """
+        :return: (height, width) array of the room names
+        """
+        if self.__room_grid is None:
+            names = [self.get_room_name(r) for r in range(self.get_room_count())]
+            self.__room_grid = np.array(names).reshape(self.__height, self.__width)
+        return self.__room_grid
+
+    def get_width(self):
+        return self.__width
+
+    def get_height(self):
+        return self.__height
+
+    def get_room_count(self):
+        return self.__width * self.__height
+
+    def get_horizontal_cost(self):
+        return self.__horizontal_cost
+
+    def get_vertical_cost(self):
+        return self.__vertical_cost
+
+    def set_start(self, start: str):
+        self.__start = start
+
+    def set_goal(self, goal: str):
+        self.__goal = goal
+
+    def set_search_algorithm(self, search_algorithm):
+        self.__search_algorithm = search_algorithm
+
+    def get_start(self):
+        return self.__start
+
+    def get_goal(self):
+        return self.__goal
+
+    def get_search_algorithm(self):
+        return self.__search_algorithm
+
+    def get_walls(self):
+        """
+        :return: dictionary that has the joined names of the adjacent rooms ("AB") as key and True if there is a wall
+        """
+        horizontal_walls, vertical_walls = self.get_wall_arrays()
+        walls = {}
+        for i in range(self.__height):
+            for j in range(self.__width):
+                if j != self.__width - 1:
+                    walls[self.maze[i][j] + self.maze[i][j + 1]] = bool(horizontal_walls[i, j])
+                if i != self.__height - 1:
+                    walls[self.maze[i][j] + self.maze[i + 1][j]] = bool(vertical_walls[i, j])
+        return walls
+
+    def get_wall_arrays(self):
+        """
+        :return: tuple(horizontal walls, vertical walls) boolean arrays of shapes (height, width - 1) and (height - 1, width)
+        """
+        return (self.__unpack_bitboard(self.__horizontal_walls)[:, :-1],
+                self.__unpack_bitboard(self.__vertical_walls)[:-1, :])
+
+    def set_wall_arrays(self, horizontal_walls, vertical_walls):
+        """
+        :param horizontal_walls: boolean array of shape (height, width - 1)
+        :param vertical_walls: boolean array of shape (height - 1, width)
+        """
+        horizontal_walls = np.asarray(horizontal_walls, dtype=bool)
+        vertical_walls = np.asarray(vertical_walls, dtype=bool)
+        if horizontal_walls.shape != (self.__height, self.__width - 1) or vertical_walls.shape != (self.__height - 1, self.__width):
+            raise ValueError("Wall arrays do not match the maze size")
+        horizontal = np.zeros((self.__height, self.__width), dtype=bool)
+        horizontal[:, :-1] = horizontal_walls
+        vertical = np.zeros((self.__height, self.__width), dtype=bool)
+        vertical[:-1, :] = vertical_walls
+        self.set_bitboards(self.__pack_bitboard(horizontal), self.__pack_bitboard(vertical))
+
+    def get_bitboards(self):
+        """
+        :return: tuple(horizontal walls, vertical walls) bitboards as (height, words) little-endian uint64 arrays
+        """
+        return self.__horizontal_walls, self.__vertical_walls
+
+    def set_bitboards(self, horizontal_walls, vertical_walls):
+        """
+        Set all the walls from the bitboards, the bits outside of the grid (last column of the horizontal walls,
+        last row of the vertical walls, padding of the last word) are cleared
+        """
+        horizontal_walls = np.array(horizontal_walls, dtype="<u8").reshape(self.__height, self.__words)
+        vertical_walls = np.array(vertical_walls, dtype="<u8").reshape(self.__height, self.__words)
+        self.__horizontal_walls = horizontal_walls & self.__column_mask(self.__width - 1)
+        self.__vertical_walls = vertical_walls & self.__column_mask(self.__width)
+        self.__vertical_walls[-1, :] = 0
+        self.__adjacency_valid = False
+        self.__walls_changed(None)
+
+    def __column_mask(self, columns: int):
+        """
+        :return: one bitboard row that has the bits of the first columns set
+        """
+        bits = np.zeros(self.__words * WORD_BITS, dtype=bool)
+        bits[:columns] = True
+        return np.packbits(bits, bitorder="little").view("<u8")
+
+    def __pack_bitboard(self, rooms):
+        """
+        :param rooms: (height, width) boolean array
+        :return: (height, words) bitboard
+        """
+        padded = np.zeros((self.__height, self.__words * WORD_BITS), dtype=bool)
+        padded[:, :self.__width] = rooms
+        return np.packbits(padded, axis=1, bitorder="little").view("<u8")
+
+    def __unpack_bitboard(self, bitboard):
+        """
+        :return: (height, width) boolean array of the bits of a bitboard
+        """
+        return np.unpackbits(bitboard.view(np.uint8), axis=1, bitorder="little")[:, :self.__width].astype(bool)
+
+    def get_open_masks(self):
+        """
+        Find the rooms that can move in every direction with bitwise operations on the wall bitboards
+        :return: tuple(up, down, right, left) bitboards, the bit of a room is set if it can move that way
+        """
+        right = ~self.__horizontal_walls & self.__column_mask(self.__width - 1)
+        down = ~self.__vertical_walls & self.__column_mask(self.__width)
+        down[-1, :] = 0
+        # the room on the right of a room with an open right side has an open left side: shift the rows by one column
+        left = right << np.uint64(1)
+        left[:, 1:] |= right[:, :-1] >> np.uint64(WORD_BITS - 1)
+        # the room below a room with an open bottom side has an open top side: shift the bitboard by one row
+        up = np.zeros_like(down)
+        up[1:] = down[:-1]
+        return up, down, right, left
+
+    def get_edge_count(self):
+        """
+        :return: number of the places that a wall can be put
+        """
+        return self.__height * (self.__width - 1) + (self.__height - 1) * self.__width
+
+    @staticmethod
+    def edge_slots(width: int, height: int):
+        """
+        :return: (height, width, 2) boolean array, True where a room has a horizontal (0) or vertical (1) wall place,
+        the edges in the order of its True values are the bits of get_wall_mask()
+        """
+        slots = np.zeros((height, width, 2), dtype=bool)
+        slots[:, :-1, 0] = True
+        slots[:-1, :, 1] = True
+        return slots
+
+    def get_wall_mask(self):
+        """
+        Encode the walls as an integer, bit k is set if there is a wall at the k-th edge in get_walls() order
+        (for the 3x3 maze: A-B, A-D, B-C, B-E, ..., H-I)
+        """
+        slots = Maze.edge_slots(self.__width, self.__height)
+        walls = np.stack([self.__unpack_bitboard(self.__horizontal_walls), self.__unpack_bitboard(self.__vertical_walls)], axis=-1)
+        return int.from_bytes(np.packbits(walls[slots], bitorder="little").tobytes(), "little")
+
+    def set_wall_mask(self, mask: int):
+        """
+        Set all the walls from an integer made by get_wall_mask()
+        """
+        slots = Maze.edge_slots(self.__width, self.__height)
+        edge_count = self.get_edge_count()
+        bits = np.unpackbits(np.frombuffer(mask.to_bytes((edge_count + 7) // 8, "little"), dtype=np.uint8), bitorder="little")
+        walls = np.zeros(slots.shape, dtype=bool)
+        walls[slots] = bits[:edge_count]
+        self.set_bitboards(self.__pack_bitboard(walls[:, :, 0]), self.__pack_bitboard(walls[:, :, 1]))
+
+    def set_walls(self, wall_edges):
+        """
+        :param wall_edges: list of walls as "A-B" strings
+        """
+        for wall in wall_edges:
+            r1, r2 = wall.split("-")
+            self.set_wall(self.room_id(r1), self.room_id(r2))
+
+    def remove_walls(self, wall_edges):
+        """
+        :param wall_edges: list of walls as "A-B" strings
+        """
+        for wall in wall_edges:
+            r1, r2 = wall.split("-")
+            self.set_wall(self.room_id(r1), self.room_id(r2), False)
+
+    def set_wall(self, r1: int, r2: int, wall: bool = True):
+        """
+        Put (or remove) the wall between two adjacent rooms given by index
+        """
+        bitboard, i, j = self.__wall_bit(r1, r2)
+        r1, r2 = min(r1, r2), max(r1, r2)
+        bit = np.uint64(1 << (j % WORD_BITS))
+        if wall:
+            bitboard[i, j // WORD_BITS] |= bit
+        else:
+            bitboard[i, j // WORD_BITS] &= ~bit
+        if self.__adjacency_valid:
+            self.__build_adjacency_row(r1)
+            self.__build_adjacency_row(r2)
+        self.__walls_changed((r1, r2))
+
+    def add_wall_listener(self, listener):
+        """
+        :param listener: function that is called with the maze and the indexes of the two rooms of the changed wall
+        after a wall is changed (None instead of the rooms when all the walls are set at once)
+        """
+        self.__wall_listeners.append(listener)
+
+    def remove_wall_listener(self, listener):
+        self.__wall_listeners.remove(listener)
+
+    def __walls_changed(self, rooms):
+        self.__layout_key = None
+        for listener in self.__wall_listeners:
+            listener(self, rooms)
+
+    def get_layout_key(self):
+        """
+        :return: hashable key that is equal for the mazes with the same size, move costs and walls,
+        the walls are the bytes of the two bitboards
+        """
+        if self.__layout_key is None:
+            self.__layout_key = (self.__width, self.__height, self.__horizontal_cost, self.__vertical_cost,
+                                 self.__horizontal_walls.tobytes() + self.__vertical_walls.tobytes())
+        return self.__layout_key
+
+    @classmethod
+    def from_layout_key(cls, layout_key):
+        """
+        :return: Maze built from a key made by get_layout_key()
+        """
+        width, height, horizontal_cost, vertical_cost, wall_bytes = layout_key
+        maze = cls(width, height, horizontal_cost, vertical_cost)
+        bitboards = np.frombuffer(wall_bytes, dtype="<u8").reshape(2, height, -1)
+        maze.set_bitboards(bitboards[0], bitboards[1])
+        return maze
+
+    def __wall_bit(self, r1: int, r2: int):
+        """
+        :return: tuple(bitboard, row, column) of the wall between two adjacent rooms given by index
+        """
+        r1, r2 = min(r1, r2), max(r1, r2)
+        i, j = divmod(r1, self.__width)
+        if r2 == r1 + 1 and j != self.__width - 1:
+            return self.__horizontal_walls, i, j
+        elif r2 == r1 + self.__width and r2 < self.get_room_count():
+            return self.__vertical_walls, i, j
+        raise ValueError("Rooms {} and {} are not adjacent".format(r1, r2))
+
+    def __bit(self, bitboard, i: int, j: int):
+        return (int(bitboard[i, j // WORD_BITS]) >> (j % WORD_BITS)) & 1 == 1
+
+    def has_wall(self, r1: int, r2: int):
+        bitboard, i, j = self.__wall_bit(r1, r2)
+        return self.__bit(bitboard, i, j)
+
+    def coordinate(self, l: str):
+        """
+            Returns the coordinates of a room in ndarray
+        """
+        return divmod(self.room_id(l), self.__width)
+
+    def room_id(self, l: str):
+        """
+            Returns the index of a room
+        """
+        if self.__room_names is None:
+            r = int(l) if l.isdigit() else -1
+            if r >= self.get_room_count() or str(r) != l:
+                raise KeyError(l)
+            return r
+        if self.__room_ids is None:
+            self.__room_ids = {name: r for r, name in enumerate(self.__room_names)}
+        return self.__room_ids[l]
+
+    def room_coordinate(self, r: int):
+        """
+            Returns the coordinates of a room given by index
+        """
+        return divmod(r, self.__width)
+
+    def coordinate_id(self, t):
+        """
+            Returns the index of the room at the coordinates
+        """
+        return t[0] * self.__width + t[1]
+
+    def get_room_name(self, r: int):
+        if self.__room_names is None:
+            return str(r)
+        return self.__room_names[r]
+
+    def room_name(self, t):
+        return self.get_room_name(t[0] * self.__width + t[1])
+
+    def __build_adjacency(self):
+        """
+        Build the adjacency arrays of all rooms from the wall arrays
+        """
+        h, w = self.__height, self.__width
+        ids = np.arange(h * w, dtype=np.int32).reshape(h, w)
+        candidates = np.stack([ids - w, ids + w, ids + 1, ids - 1], axis=-1).reshape(-1, MAX_NEIGHBORS)
+        costs = np.array([self.__vertical_cost, self.__vertical_cost, self.__horizontal_cost, self.__horizontal_cost], dtype=np.int32)
+
+        is_open = np.stack([self.__unpack_bitboard(mask) for mask in self.get_open_masks()], axis=-1)  # up, down, right, left
+        is_open = is_open.reshape(-1, MAX_NEIGHBORS)
+
+        # move the open neighbors to the front of every row, keeping their order
+        order = np.argsort(~is_open, axis=1, kind="stable")
+        index = np.take_along_axis(np.where(is_open, candidates, -1), order, axis=1)
+        cost = np.take_along_axis(np.where(is_open, costs, 0), order, axis=1)
+
+        self.__neighbor_index = array("i", index.astype(np.int32).tobytes())
+        self.__neighbor_cost = array("i", cost.astype(np.int32).tobytes())
+        self.__degree = array("i", is_open.sum(axis=1).astype(np.int32).tobytes())
+        self.__adjacency_valid = True
+
+    def __build_adjacency_row(self, r: int):
+        """
+        Rewrite the adjacency row of a single room after one of its walls is changed
+        """
+        i, j = divmod(r, self.__width)
+        base = r * MAX_NEIGHBORS
+        k = base
+        if i != 0 and not self.__bit(self.__vertical_walls, i - 1, j):
+            self.__neighbor_index[k] = r - self.__width
+            self.__neighbor_cost[k] = self.__vertical_cost
+            k += 1
+        if i != self.__height - 1 and not self.__bit(self.__vertical_walls, i, j):
+            self.__neighbor_index[k] = r + self.__width
+            self.__neighbor_cost[k] = self.__vertical_cost
+            k += 1
+        if j != self.__width - 1 and not self.__bit(self.__horizontal_walls, i, j):
+            self.__neighbor_index[k] = r + 1
+            self.__neighbor_cost[k] = self.__horizontal_cost
+            k += 1
+        if j != 0 and not self.__bit(self.__horizontal_walls, i, j - 1):
+            self.__neighbor_index[k] = r - 1
+            self.__neighbor_cost[k] = self.__horizontal_cost
+            k += 1
+        self.__degree[r] = k - base
+        for empty in range(k, base + MAX_NEIGHBORS):
+            self.__neighbor_index[empty] = -1
+            self.__neighbor_cost[empty] = 0
+
+    def get_adjacency(self):
+        """
+        :return: tuple(neighbor_index, neighbor_cost, degree) as compact integer arrays, see the class description
+        """
+        if not self.__adjacency_valid:
+            self.__build_adjacency()
+        return self.__neighbor_index, self.__neighbor_cost, self.__degree
+
+    def get_adjacency_arrays(self):
+        """
+        :return: the adjacency arrays as NumPy views, of shapes (rooms, MAX_NEIGHBORS) and (rooms,)
+        """
+        neighbor_index, neighbor_cost, degree = self.get_adjacency()
+        return (np.frombuffer(neighbor_index, dtype=np.int32).reshape(-1, MAX_NEIGHBORS),
+                np.frombuffer(neighbor_cost, dtype=np.int32).reshape(-1, MAX_NEIGHBORS),
+                np.frombuffer(degree, dtype=np.int32))
+
+    def neighbor_range(self, r: int):
+        """
+        :param r: index of the room
+        :return: (start, end) positions of the room's neighbors in the adjacency arrays
+        """
+        if not self.__adjacency_valid:
+            self.__build_adjacency()
+        start = r * MAX_NEIGHBORS
+        return start, start + self.__degree[r]
+
+    def neighbors(self, c_room: str):
+        """Looks the neighbor rooms of the current room and if there is no wall between them, adds to the dictionary
+        :param c_room: room that's neighbors will be found
+        :return: dictionary that has the room names as key and cost to reach them as value
+        """
+        start, end = self.neighbor_range(self.room_id(c_room))
+        n_dict = {}
+        for k in range(start, end):
+            n_dict[self.get_room_name(self.__neighbor_index[k])] = self.__neighbor_cost[k]
+        return n_dict
+
+    def __str__(self):
+        """
+        :return: the image of the maze as string
+        """
+        horizontal_walls, vertical_walls = self.get_wall_arrays()
+        maze_str = ""
+        for i in range(self.__height):
+            for j in range(self.__width):
+                maze_str = maze_str + "\t" + self.maze[i][j] + "\t"
+
+                if j != self.__width - 1:
+                    if horizontal_walls[i, j]:
+                        maze_str = maze_str + "|"
+
+            maze_str += "\n"
+            for j in range(self.__width):
+                if i != self.__height - 1:
+                    if vertical_walls[i, j]:
+                        maze_str += "   ___\t"
+                    else:
+                        maze_str += "    \t"
+
+            maze_str += "\n\n"
+
+        return maze_str
+
+
+class Frontier:
+    """
+        A priority queue (binary heap) that holds tuple(path, cost)
+
+        Paths are ordered by cost, then by the name of the last room of the path,
+        then by insertion order, so the removal order is deterministic.
+        A path is either a "A-B-C" string or a node index of Search_Nodes.
+
+        A histogram of the costs (cost -> number of paths) and the highest cost are kept on every push and pop,
+        so get_snapshot() reports them without a pass over the heap.
+    """
+    __frontier = None
+    __size = None
+    __counter = None
+    __peak_size = None
+    __histogram = None  # cost -> number of paths with that cost
+    __max_cost = None
+
+    def __init__(self):
+        self.__frontier = []
+        self.__size = 0
+        self.__counter = 0
+        self.__peak_size = 0
+        self.__histogram = {}
+        self.__max_cost = None
+
+    def get_size(self):
+        return self.__size
+
+    def get_peak_size(self):
+        """
+        :return: the largest size that the frontier has reached
+        """
+        return self.__peak_size
+
+    def get_push_count(self):
+        return self.__counter
+
+    def add_path(self, path_tuple: tuple, room=None):
+        """
+        Push a path to the frontier in O(log n)
+        :param path_tuple: (path, cost)
+        :param room: last room of the path, taken from the "A-B-C" path string when not given
+        """
+        if room is None:
+            room = path_tuple[0].rsplit("-", 1)[-1]
+        cost = path_tuple[1]
+        heapq.heappush(self.__frontier, (cost, room, self.__counter, path_tuple))
+        self.__counter += 1
+        self.__size += 1
+        if self.__size > self.__peak_size:
+            self.__peak_size = self.__size
+        self.__histogram[cost] = self.__histogram.get(cost, 0) + 1
+        if self.__max_cost is None or cost > self.__max_cost:
+            self.__max_cost = cost
+
+    def sort_frontier(self):
+        """
+        Kept for compatibility, the heap is always ordered on push and pop
+        """
+        pass
+
+    def remove_path(self):
+        """
+        Remove the first element (lowest cost) from frontier in O(log n)
+        :return: Removed item
+        """
+        if self.__size == 0:
+            logger.info("Fringe is already empty")
+            return False
+        else:
+            self.__size -= 1
+            cost, _, _, path_tuple = heapq.heappop(self.__frontier)
+            count = self.__histogram[cost] - 1
+            if count != 0:
+                self.__histogram[cost] = count
+            else:
+                del self.__histogram[cost]
+                if cost == self.__max_cost:
+                    self.__max_cost = max(self.__histogram) if self.__histogram else None
+            return path_tuple
+
+    def peek_path(self):
+        """
+        :return: the first element (lowest cost) without removing it, False if the frontier is empty
+        """
+        if self.__size == 0:
+            return False
+        return self.__frontier[0][3]
+
+    def get_snapshot(self, k: int = 10, path_string=None):
+        """
+        Read the k first elements in removal order without copying the heap: the heap positions are visited from
+        the root with a small heap of candidates (the children of the visited positions), in O(k log k)
+        :param path_string: function that turns a path into a string, used when paths are node indexes
+        :return: dictionary with "entries" (list of (path, cost)), "size", "min_cost", "max_cost" and "histogram" (cost -> count)
+        """
+        heap = self.__frontier
+        entries = []
+        candidates = [(heap[0], 0)] if heap else []
+        while candidates and len(entries) < k:
+            entry, position = heapq.heappop(candidates)
+            entries.append((entry[3][0] if path_string is None else path_string(entry[3][0]), entry[3][1]))
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(heap):
+                    heapq.heappush(candidates, (heap[child], child))
+        return {
+            "entries": entries,
+            "size": self.__size,
+            "min_cost": heap[0][0] if heap else None,
+            "max_cost": self.__max_cost,
+            "histogram": dict(sorted(self.__histogram.items()))
+        }
+
+    def get_frontier_information(self, path_string=None):
+        """
+        :param path_string: function that turns a path into a string, used when paths are node indexes
+        :return: string that contains the frontier elements in removal order
+        """
+        fringe_str = ""
+        for entry in sorted(self.__frontier):
+            path = entry[3][0] if path_string is None else path_string(entry[3][0])
+            fringe_str += "{:<8s} ({:d})\n".format(path, entry[3][1])
+        return fringe_str
+
+
+class Search_Nodes:
+    """
+        Nodes of a search tree kept in parallel lists. A node is an index to the lists and holds
+        the index of its parent node (-1 for the root), its room and the cost to reach it,
+        so a path is never copied, it is rebuilt from the parents only when it is asked.
+    """
+    __slots__ = ("parent", "room", "cost")
+
+    def __init__(self):
+        self.parent = []
+        self.room = []
+        self.cost = []
+
+    def get_size(self):
+        return len(self.room)
+
+    def add_node(self, parent: int, room, cost):
+        """
+        :return: index of the new node
+        """
+        self.parent.append(parent)
+        self.room.append(room)
+        self.cost.append(cost)
+        return len(self.room) - 1
+
+    def path(self, node: int):
+        """
+        :return: list of the rooms from the root to the node
+        """
+        rooms = []
+        while node != -1:
+            rooms.append(self.room[node])
+            node = self.parent[node]
+        rooms.reverse()
+        return rooms
+
+    def path_string(self, node: int, room_name=str):
+        """
+        :param room_name: function that gives the name of a room
+        :return: path of the node as "A-B-C" string
+        """
+        return "-".join(room_name(r) for r in self.path(node))
+
+
+def weighted_manhattan(maze: Maze, goal: int):
+    """
+    :return: flat array indexed by room, the Manhattan distance of every room to the goal weighted by the move costs
+    """
+    rows, columns = np.divmod(np.arange(maze.get_room_count(), dtype=np.int64), maze.get_width())
+    goal_row, goal_column = maze.room_coordinate(goal)
+    h = np.abs(columns - goal_column) * maze.get_horizontal_cost() + np.abs(rows - goal_row) * maze.get_vertical_cost()
+    return array("i", h.astype(np.int32).tobytes())
+
+
+class Expansion_Event:
+    """
+        Sent to the observer of a search once per expanded room.
+        Timings are in nanoseconds: removing the path from the frontier, getting the neighbors of the room,
+        and pushing the children to the frontier.
+        node and parent_node are the Search_Nodes indexes of the expanded path and of its parent,
+        -1 for the searches that do not keep a single search tree.
+    """
+    __slots__ = ("step", "room", "g", "f", "frontier_size", "pushes", "pruned", "pop_ns", "neighbors_ns", "push_ns", "goal_reached",
+                 "node", "parent_node")
+
+    def __init__(self, step, room, g, f, frontier_size, pushes, pruned, pop_ns, neighbors_ns, push_ns, goal_reached, node=-1, parent_node=-1):
+        self.step = step
+        self.room = room
+        self.g = g
+        self.f = f
+        self.frontier_size = frontier_size
+        self.pushes = pushes
+        self.pruned = pruned
+        self.pop_ns = pop_ns
+        self.neighbors_ns = neighbors_ns
+        self.push_ns = push_ns
+        self.goal_reached = goal_reached
+        self.node = node
+        self.parent_node = parent_node
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Uniform_Cost_Search:
+    """
+        Uniform cost search over the rooms of a maze.
+
+        In tree search mode (default) a room can be expanded many times through different paths, only turning back
+        to the previous room is pruned. In graph search mode every room is expanded at most once and a child is not
+        pushed unless its cost is lower than the best known cost of that room.
+
+        settle_targets() runs a single Dijkstra from the start room to settle many goals (or every room) at once.
+    """
+    __start = None # room index
+    __goal = None  # room index
+    __maze = None
+    __frontier = None
+    __nodes = None
+    __solution = None
+    __expanded_node = None
+    __expanded_cost = None
+    __expanded_room = None
+    __expansion_count = None
+    __observer = None
+    __graph_search = None
+    __closed = None  # rooms that are already expanded
+    __best_cost = None  # room index -> lowest cost that the room is pushed with
+
+    def __init__(self, start_room: str, goal_room: str, m: Maze, graph_search: bool = False):
+        """
+        :param goal_room: may be None when the search is only used with settle_targets()
+        """
+        self.__frontier = Frontier()
+        self.__nodes = Search_Nodes()
+        self.__maze = m
+        self.__start = self.__maze.room_id(start_room)
+        self.__goal = self.__maze.room_id(goal_room) if goal_room is not None else -1
+        self.__solution = ""
+        self.__expanded_node = -1
+        self.__expanded_cost = 0
+        self.__expanded_room = -1
+        self.__expansion_count = 0
+        self.__observer = None
+        self.__graph_search = graph_search
+        self.__closed = set()
+        self.__best_cost = {}
+
+    def get_start_room(self):
+        return self.__maze.get_room_name(self.__start)
+
+    def get_goal_room(self):
+        if self.__goal == -1:
+            return ""
+        return self.__maze.get_room_name(self.__goal)
+
+    def get_expanded_path(self):
+        return self.__nodes.path_string(self.__expanded_node, self.__maze.get_room_name)
+
+    def get_expanded_cost(self):
+        return self.__expanded_cost
+
+    def get_expanded_room(self):
+        if self.__expanded_room == -1:
+            return ""
+        return self.__maze.get_room_name(self.__expanded_room)
+
+    def set_observer(self, observer):
+        """
+        :param observer: function that is called with an Expansion_Event after every expansion, None to stop
+        """
+        self.__observer = observer
+
+    def get_expansion_count(self):
+        return self.__expansion_count
+
+    def get_frontier_size(self):
+        return self.__frontier.get_size()
+
+    def get_frontier_peak(self):
+        return self.__frontier.get_peak_size()
+
+    def frontier_information(self):
+        """
+        :return: String that contains the elements of the frontier
+        """
+        return self.__frontier.get_frontier_information(lambda node: self.__nodes.path_string(node, self.__maze.get_room_name))
+
+    def frontier_snapshot(self, k: int = 10):
+        """
+        :return: the k first paths of the frontier and its statistics, see Frontier.get_snapshot()
+        """
+        return self.__frontier.get_snapshot(k, lambda node: self.__nodes.path_string(node, self.__maze.get_room_name))
+
+    def start_search(self):
+        """
+            Initialize the search by pushing the start room to frontier
+        """
+        tmp_room = self.__start
+        tmp_cost = 0
+        self.__best_cost[tmp_room] = tmp_cost
+        self.__frontier.add_path((self.__nodes.add_node(-1, tmp_room, tmp_cost), tmp_cost), tmp_room)
+
+    def expand_room(self):
+        """
+        Expand the room from the path that has the lowest cost. Set the solution until the goal is reached or frontier is empty.
+        :return: True if there cannot be no more expand
+        """
+        nodes = self.__nodes
+        observer = self.__observer
+        if observer is not None:
+            pop_begin = perf_counter_ns()
+        while True:
+            if self.__frontier.get_size() == 0:
+                logger.info("Fringe is empty. Cannot continue to search.")
+                self.__solution = False
+                return True
+
+            expanded_tuple = self.__frontier.remove_path()
+            if not self.__graph_search or nodes.room[expanded_tuple[0]] not in self.__closed:
+                break  # in graph search, skip the paths to the rooms that are already expanded
+
+        self.__expanded_node = expanded_tuple[0]
+        self.__expanded_cost = expanded_tuple[1]
+        self.__expanded_room = nodes.room[self.__expanded_node]
+        self.__expansion_count += 1
+        if self.__graph_search:
+            self.__closed.add(self.__expanded_room)
+
+        if self.__expanded_room == self.__goal:
+            self.__solution = expanded_tuple
+            if observer is not None:
+                pop_end = perf_counter_ns()
+                self.__notify(observer, 0, 0, pop_end - pop_begin, 0, 0, True)
+            return True
+        if observer is not None:
+            pop_end = perf_counter_ns()
+
+        neighbor_index, neighbor_cost, degree = self.__maze.get_adjacency()
+        parent_node = nodes.parent[self.__expanded_node]
+
+        start, end = self.__maze.neighbor_range(self.__expanded_room)
+        if observer is not None:
+            neighbors_end = perf_counter_ns()
+        pruned = 0
+        for k in range(start, end):
+            key = neighbor_index[k]
+            tmp_cost = self.__expanded_cost + neighbor_cost[k]
+            if self.__graph_search:
+                if key in self.__closed or self.__best_cost.get(key, tmp_cost + 1) <= tmp_cost:
+                    pruned += 1
+                    continue  # a path to this room with lower or equal cost is already known
+                self.__best_cost[key] = tmp_cost
+            elif parent_node != -1 and key == nodes.room[parent_node]:
+                pruned += 1
+                continue  # do not turn back
+            self.__frontier.add_path((nodes.add_node(self.__expanded_node, key, tmp_cost), tmp_cost), key)
+
+        if observer is not None:
+            self.__notify(observer, end - start - pruned, pruned, pop_end - pop_begin, neighbors_end - pop_end, perf_counter_ns() - neighbors_end, False)
+
+    def __notify(self, observer, pushes, pruned, pop_ns, neighbors_ns, push_ns, goal_reached):
+        observer(Expansion_Event(self.__expansion_count, self.__expanded_room, self.__expanded_cost, self.__expanded_cost,
+                                 self.__frontier.get_size(), pushes, pruned, pop_ns, neighbors_ns, push_ns, goal_reached,
+                                 self.__expanded_node, self.__nodes.parent[self.__expanded_node]))
+
+    def settle_targets(self, goals="all"):
+        """
+        Expand the rooms in cost order from the start room until all goals are settled (graph search)
+        :param goals: room names to settle, or "all" to settle every reachable room
+        :return: tuple(distance, parent) arrays indexed by room: the cost from the start room and the room before it
+        on the shortest path, both -1 for the rooms that are not settled (the start room's parent is -1 as well)
+        """
+        room_count = self.__maze.get_room_count()
+        distance = np.full(room_count, -1, dtype=np.int64)
+        parent = np.full(room_count, -1, dtype=np.int32)
+        remaining = None if goals == "all" else {self.__maze.room_id(goal) for goal in goals}
+
+        neighbor_index, neighbor_cost, degree = self.__maze.get_adjacency()
+        frontier = Frontier()
+        best_cost = {self.__start: 0}
+        best_parent = {self.__start: -1}
+        frontier.add_path((self.__start, 0), self.__start)
+        while frontier.get_size() != 0:
+            room, cost = frontier.remove_path()
+            if distance[room] != -1:
+                continue  # already settled with a lower cost
+            distance[room] = cost
+            parent[room] = best_parent[room]
+            self.__expansion_count += 1
+            if remaining is not None:
+                remaining.discard(room)
+                if not remaining:
+                    break
+
+            base = room * MAX_NEIGHBORS
+            for k in range(base, base + degree[room]):
+                child = neighbor_index[k]
+                child_cost = cost + neighbor_cost[k]
+                if distance[child] == -1 and child_cost < best_cost.get(child, child_cost + 1):
+                    best_cost[child] = child_cost
+                    best_parent[child] = room
+                    frontier.add_path((child, child_cost), child)
+        return distance, parent
+
+    def get_solution_path(self):
+        """
+        :return: list of the room names from start to goal, None if the goal is not reached
+        """
+        if not self.__solution:
+            return None
+        return [self.__maze.get_room_name(r) for r in self.__nodes.path(self.__solution[0])]
+
+    def get_solution_cost(self):
+        """
+        :return: cost of the solution path, None if the goal is not reached
+        """
+        if not self.__solution:
+            return None
+        return self.__nodes.cost[self.__solution[0]]
+
+    def get_solution(self):
+        if not self.__solution:
+            return "Solution cannot be found"
+        else: # solution is set as expanded tuple if the expanded node is equal to goal
+            return "{: <15} :{: <5}".format(self.__nodes.path_string(self.__solution[0], self.__maze.get_room_name), self.__solution[1])
+
+
+class A_Star_Search:
+    """
+        A* search over the rooms of a maze, the frontier is ordered by cost + heuristic.
+        The heuristic is the Manhattan distance to the goal weighted by the horizontal and vertical move costs,
+        it is computed for every room at once when the search starts.
+
+        Tree search (default) and graph search modes work as in Uniform_Cost_Search.
+    """
+    __start = None # room index
+    __goal = None  # room index
+    __maze = None
+    __frontier = None
+    __nodes = None
+    __solution = None
+    __expanded_node = None
+    __expanded_cost = None
+    __expanded_g = None
+    __expanded_room = None
+    __heuristic = None  # room index -> estimated cost to the goal
+    __expansion_count = None
+    __observer = None
+    __graph_search = None
+    __closed = None  # rooms that are already expanded
+    __best_cost = None  # room index -> lowest cost (without heuristic) that the room is pushed with
+
+    def __init__(self, start_room: str, goal_room: str, m: Maze, graph_search: bool = False):
+        self.__frontier = Frontier()
+        self.__nodes = Search_Nodes()
+        self.__maze = m
+        self.__start = self.__maze.room_id(start_room)
+        self.__goal = self.__maze.room_id(goal_room)
+        self.__solution = ""
+        self.__expanded_node = -1
+        self.__expanded_cost = 0
+        self.__expanded_g = 0
+        self.__expanded_room = -1
+        self.__expansion_count = 0
+        self.__observer = None
+        self.__graph_search = graph_search
+        self.__closed = set()
+        self.__best_cost = {}
+
+    def get_start_room(self):
+        return self.__maze.get_room_name(self.__start)
+
+    def get_goal_room(self):
+        return self.__maze.get_room_name(self.__goal)
+
+    def get_expanded_path(self):
+        return self.__nodes.path_string(self.__expanded_node, self.__maze.get_room_name)
+
+    def get_expanded_cost(self):
+        return self.__expanded_cost
+
+    def get_expanded_g(self):
+        """
+        :return: cost of the expanded path without the heuristic
+        """
+        return self.__expanded_g
+
+    def get_expanded_room(self):
+        if self.__expanded_room == -1:
+            return ""
+        return self.__maze.get_room_name(self.__expanded_room)
+
+    def set_observer(self, observer):
+        """
+        :param observer: function that is called with an Expansion_Event after every expansion, None to stop
+        """
+        self.__observer = observer
+
+    def get_expansion_count(self):
+        return self.__expansion_count
+
+    def get_frontier_size(self):
+        return self.__frontier.get_size()
+
+    def get_frontier_peak(self):
+        return self.__frontier.get_peak_size()
+
+    def frontier_information(self):
+        """
+        :return: String that contains the elements of the frontier
+        """
+        return self.__frontier.get_frontier_information(lambda node: self.__nodes.path_string(node, self.__maze.get_room_name))
+
+    def frontier_snapshot(self, k: int = 10):
+        """
+        :return: the k first paths of the frontier and its statistics, see Frontier.get_snapshot()
+        """
+        return self.__frontier.get_snapshot(k, lambda node: self.__nodes.path_string(node, self.__maze.get_room_name))
+
+
+    def build_heuristic(self):
+        """
+        Compute the weighted Manhattan distance of every room to the goal in one vectorized pass
+        """
+        self.__heuristic = weighted_manhattan(self.__maze, self.__goal)
+
+    def heuristic(self, r: int):
+        if self.__heuristic is None:
+            self.build_heuristic()
+        return self.__heuristic[r]
+
+
+    def start_search(self):
+        """
+            Initialize the search by pushing the start room to frontier
+        """
+        self.build_heuristic()
+        tmp_room = self.__start
+        tmp_cost = 0 + self.__heuristic[tmp_room]
+        self.__best_cost[tmp_room] = 0
+        self.__frontier.add_path((self.__nodes.add_node(-1, tmp_room, 0), tmp_cost), tmp_room)
+
+    def expand_room(self):
+        """
+        Expand the room from the path that has the lowest cost. Set the solution until the goal is reached or frontier is empty.
+        :return: True if there cannot be no more expand
+        """
+        nodes = self.__nodes
+        observer = self.__observer
+        if observer is not None:
+            pop_begin = perf_counter_ns()
+        while True:
+            if self.__frontier.get_size() == 0:
+                logger.info("Fringe is empty. Cannot continue to search.")
+                self.__solution = False
+                return True
+
+            expanded_tuple = self.__frontier.remove_path()
+            if not self.__graph_search or nodes.room[expanded_tuple[0]] not in self.__closed:
+                break  # in graph search, skip the paths to the rooms that are already expanded
+
+        self.__expanded_node = expanded_tuple[0]
+        self.__expanded_room = nodes.room[self.__expanded_node]
+        self.__expanded_g = nodes.cost[self.__expanded_node]
+        self.__expanded_cost = expanded_tuple[1]
+        self.__expansion_count += 1
+        if self.__graph_search:
+            self.__closed.add(self.__expanded_room)
+
+        if self.__expanded_room == self.__goal:
+            self.__solution = expanded_tuple
+            if observer is not None:
+                pop_end = perf_counter_ns()
+                self.__notify(observer, 0, 0, pop_end - pop_begin, 0, 0, True)
+            return True
+        if observer is not None:
+            pop_end = perf_counter_ns()
+
+        neighbor_index, neighbor_cost, degree = self.__maze.get_adjacency()
+        heuristic = self.__heuristic
+        parent_node = nodes.parent[self.__expanded_node]
+
+        start, end = self.__maze.neighbor_range(self.__expanded_room)
+        if observer is not None:
+            neighbors_end = perf_counter_ns()
+        pruned = 0
+        for k in range(start, end):
+            key = neighbor_index[k]
+            tmp_cost = self.__expanded_g + neighbor_cost[k]
+            if self.__graph_search:
+                if key in self.__closed or self.__best_cost.get(key, tmp_cost + 1) <= tmp_cost:
+                    pruned += 1
+                    continue  # a path to this room with lower or equal cost is already known
+                self.__best_cost[key] = tmp_cost
+            elif parent_node != -1 and key == nodes.room[parent_node]:
+                pruned += 1
+                continue  # do not turn back
+            tmp_node = nodes.add_node(self.__expanded_node, key, tmp_cost)
+            self.__frontier.add_path((tmp_node, tmp_cost + heuristic[key]), key)
+
+        if observer is not None:
+            self.__notify(observer, end - start - pruned, pruned, pop_end - pop_begin, neighbors_end - pop_end, perf_counter_ns() - neighbors_end, False)
+
+
+    def __notify(self, observer, pushes, pruned, pop_ns, neighbors_ns, push_ns, goal_reached):
+        observer(Expansion_Event(self.__expansion_count, self.__expanded_room, self.__expanded_g, self.__expanded_cost,
+                                 self.__frontier.get_size(), pushes, pruned, pop_ns, neighbors_ns, push_ns, goal_reached,
+                                 self.__expanded_node, self.__nodes.parent[self.__expanded_node]))
+
+    def get_solution_path(self):
+        """
+        :return: list of the room names from start to goal, None if the goal is not reached
+        """
+        if not self.__solution:
+            return None
+        return [self.__maze.get_room_name(r) for r in self.__nodes.path(self.__solution[0])]
+
+    def get_solution_cost(self):
+        """
+        :return: cost of the solution path, None if the goal is not reached
+        """
+        if not self.__solution:
+            return None
+        return self.__nodes.cost[self.__solution[0]]
+
+    def get_solution(self):
+        if not self.__solution:
+            return "Solution cannot be found"
+        else: # solution is set as expanded tuple if the expanded node is equal to goal
+            return "{: <15} :{: <5}".format(self.__nodes.path_string(self.__solution[0], self.__maze.get_room_name), self.__solution[1])
+
+
+class Bidirectional_Search:
+    """
+        Bidirectional graph search: one frontier grows from the start room and one from the goal room,
+        every expand_room() call expands a room from the smaller frontier.
+
+        The moves cost the same in both directions, so the backward search uses the same adjacency arrays.
+        mu is the cost of the best path found where the two searches meet. Without heuristic (uniform cost) the
+        search stops when the lowest costs of the two frontiers add up to mu or more. With the A* heuristic
+        (weighted Manhattan distance to the goal forward, to the start backward) it stops when the lowest f of
+        either frontier is mu or more. Both conditions guarantee that no cheaper path is left.
+    """
+    FORWARD = 0
+    BACKWARD = 1
+
+    __start = None # room index
+    __goal = None  # room index
+    __maze = None
+    __use_heuristic = None
+    __heuristics = None  # per direction: room index -> estimate to the other end
+    __frontiers = None  # per direction
+    __nodes = None  # per direction
+    __closed = None  # per direction
+    __best_cost = None  # per direction: room index -> lowest g
+    __best_node = None  # per direction: room index -> node of the lowest g
+    __best_meeting = None  # (mu, forward node, backward node)
+    __solution = None
+    __expanded_direction = None
+    __expanded_node = None
+    __expanded_cost = None
+    __expanded_room = None
+    __expansion_count = None
+    __frontier_peak = None
+    __observer = None
+
+    def __init__(self, start_room: str, goal_room: str, m: Maze, graph_search: bool = True, heuristic: bool = False):
+        """
+        :param graph_search: accepted as in the other searches, a bidirectional search is always a graph search,
+        ValueError is raised for tree search
+        :param heuristic: order the frontiers by g + weighted Manhattan distance (bidirectional A*)
+        """
+        if not graph_search:
+            raise ValueError("Bidirectional search cannot run as a tree search")
+        self.__maze = m
+        self.__start = self.__maze.room_id(start_room)
+        self.__goal = self.__maze.room_id(goal_room)
+        self.__use_heuristic = heuristic
+        self.__frontiers = (Frontier(), Frontier())
+        self.__nodes = (Search_Nodes(), Search_Nodes())
+        self.__closed = (set(), set())
+        self.__best_cost = ({}, {})
+        self.__best_node = ({}, {})
+        self.__best_meeting = (INFINITY, -1, -1)
+        self.__solution = ""
+        self.__expanded_direction = Bidirectional_Search.FORWARD
+        self.__expanded_node = -1
+        self.__expanded_cost = 0
+        self.__expanded_room = -1
+        self.__expansion_count = 0
+        self.__frontier_peak = 0
+        self.__observer = None
+
+    def get_start_room(self):
+        return self.__maze.get_room_name(self.__start)
+
+    def get_goal_room(self):
+        return self.__maze.get_room_name(self.__goal)
+
+    def get_expanded_path(self):
+        """
+        :return: path of the expanded room from its own end (the goal room for the backward search)
+        """
+        return self.__nodes[self.__expanded_direction].path_string(self.__expanded_node, self.__maze.get_room_name)
+
+    def get_expanded_cost(self):
+        return self.__expanded_cost
+
+    def get_expanded_room(self):
+        if self.__expanded_room == -1:
+            return ""
+        return self.__maze.get_room_name(self.__expanded_room)
+
+    def set_observer(self, observer):
+        """
+        :param observer: function that is called with an Expansion_Event after every expansion, None to stop
+        """
+        self.__observer = observer
+
+    def get_expansion_count(self):
+        return self.__expansion_count
+
+    def get_frontier_size(self):
+        return self.__frontiers[0].get_size() + self.__frontiers[1].get_size()
+
+    def get_frontier_peak(self):
+        return self.__frontier_peak
+
+    def frontier_information(self):
+        """
+        :return: String that contains the elements of both frontiers
+        """
+        forward = self.__frontiers[0].get_frontier_information(lambda node: self.__nodes[0].path_string(node, self.__maze.get_room_name))
+        backward = self.__frontiers[1].get_frontier_information(lambda node: self.__nodes[1].path_string(node, self.__maze.get_room_name))
+        return "From start:\n" + forward + "From goal:\n" + backward
+
+    def frontier_snapshot(self, k: int = 10):
+        """
+        :return: the k first paths of both frontiers and their statistics as in Frontier.get_snapshot(),
+        the paths of the goal side start with "<"
+        """
+        forward = self.__frontiers[0].get_snapshot(k, lambda node: self.__nodes[0].path_string(node, self.__maze.get_room_name))
+        backward = self.__frontiers[1].get_snapshot(k, lambda node: "<" + self.__nodes[1].path_string(node, self.__maze.get_room_name))
+        histogram = dict(forward["histogram"])
+        for cost, count in backward["histogram"].items():
+            histogram[cost] = histogram.get(cost, 0) + count
+        min_costs = [side["min_cost"] for side in (forward, backward) if side["min_cost"] is not None]
+        max_costs = [side["max_cost"] for side in (forward, backward) if side["max_cost"] is not None]
+        return {
+            "entries": sorted(forward["entries"] + backward["entries"], key=lambda entry: entry[1])[:k],
+            "size": forward["size"] + backward["size"],
+            "min_cost": min(min_costs) if min_costs else None,
+            "max_cost": max(max_costs) if max_costs else None,
+            "histogram": dict(sorted(histogram.items()))
+        }
+
+    def start_search(self):
+        """
+            Initialize the search by pushing the start room to the forward and the goal room to the backward frontier
+        """
+        if self.__use_heuristic:
+            self.__heuristics = (weighted_manhattan(self.__maze, self.__goal), weighted_manhattan(self.__maze, self.__start))
+        for direction, room in ((0, self.__start), (1, self.__goal)):
+            self.__push(direction, -1, room, 0)
+        self.__frontier_peak = self.get_frontier_size()
+
+    def __push(self, direction: int, parent: int, room: int, cost):
+        node = self.__nodes[direction].add_node(parent, room, cost)
+        self.__best_cost[direction][room] = cost
+        self.__best_node[direction][room] = node
+        f = cost + self.__heuristics[direction][room] if self.__use_heuristic else cost
+        self.__frontiers[direction].add_path((node, f), room)
+
+        other_cost = self.__best_cost[1 - direction].get(room)
+        if other_cost is not None and cost + other_cost < self.__best_meeting[0]:
+            other_node = self.__best_node[1 - direction][room]
+            if direction == Bidirectional_Search.FORWARD:
+                self.__best_meeting = (cost + other_cost, node, other_node)
+            else:
+                self.__best_meeting = (cost + other_cost, other_node, node)
+
+    def __lowest_cost(self, direction: int):
+        """
+        Drop the paths to the closed rooms from the top of the frontier
+        :return: the lowest f in the frontier, infinite if it is empty
+        """
+        frontier = self.__frontiers[direction]
+        while frontier.get_size() != 0:
+            node, f = frontier.peek_path()
+            if self.__nodes[direction].room[node] not in self.__closed[direction]:
+                return f
+            frontier.remove_path()
+        return INFINITY
+
+    def __finished(self):
+        mu = self.__best_meeting[0]
+        forward, backward = self.__lowest_cost(0), self.__lowest_cost(1)
+        if forward == INFINITY or backward == INFINITY:
+            return True  # a side cannot grow anymore, mu is the answer
+        if self.__use_heuristic:
+            return max(forward, backward) >= mu
+        return forward + backward >= mu
+
+    def expand_room(self):
+        """
+        Expand a room from the smaller frontier. Set the solution when the stop condition holds.
+        :return: True if there cannot be no more expand
+        """
+        observer = self.__observer
+        if observer is not None:
+            pop_begin = perf_counter_ns()
+        if self.__finished():
+            if self.__best_meeting[0] == INFINITY:
+                logger.info("Fringe is empty. Cannot continue to search.")
+                self.__solution = False
+            else:
+                self.__solution = self.__best_meeting
+            return True
+
+        direction = 0 if self.__frontiers[0].get_size() <= self.__frontiers[1].get_size() else 1
+        nodes = self.__nodes[direction]
+        closed = self.__closed[direction]
+        best_cost = self.__best_cost[direction]
+        node, f = self.__frontiers[direction].remove_path()  # not closed, see __lowest_cost()
+
+        self.__expanded_direction = direction
+        self.__expanded_node = node
+        self.__expanded_cost = f
+        self.__expanded_room = nodes.room[node]
+        self.__expansion_count += 1
+        closed.add(self.__expanded_room)
+        g = nodes.cost[node]
+        if observer is not None:
+            pop_end = perf_counter_ns()
+
+        neighbor_index, neighbor_cost, degree = self.__maze.get_adjacency()
+        start, end = self.__maze.neighbor_range(self.__expanded_room)
+        if observer is not None:
+            neighbors_end = perf_counter_ns()
+        pruned = 0
+        for k in range(start, end):
+            key = neighbor_index[k]
+            tmp_cost = g + neighbor_cost[k]
+            if key in closed or best_cost.get(key, tmp_cost + 1) <= tmp_cost:
+                pruned += 1
+                continue  # a path to this room with lower or equal cost is already known
+            self.__push(direction, node, key, tmp_cost)
+
+        self.__frontier_peak = max(self.__frontier_peak, self.get_frontier_size())
+        if observer is not None:
+            observer(Expansion_Event(self.__expansion_count, self.__expanded_room, g, f, self.get_frontier_size(), end - start - pruned,
+                                     pruned, pop_end - pop_begin, neighbors_end - pop_end, perf_counter_ns() - neighbors_end, False))
+
+    def get_solution_path(self):
+        """
+        :return: list of the room names from start to goal, None if the goal is not reached
+        """
+        if not self.__solution:
+            return None
+        _, forward_node, backward_node = self.__solution
+        rooms = self.__nodes[0].path(forward_node) + self.__nodes[1].path(backward_node)[::-1][1:]
+        return [self.__maze.get_room_name(r) for r in rooms]
+
+    def get_solution_cost(self):
+        """
+        :return: cost of the solution path, None if the goal is not reached
+        """
+        if not self.__solution:
+            return None
+        return self.__solution[0]
+
+    def get_solution(self):
+        if not self.__solution:
+            return "Solution cannot be found"
+        else:
+            return "{: <15} :{: <5}".format("-".join(self.get_solution_path()), self.__solution[0])
+
+
+class Bidirectional_Uniform_Cost_Search(Bidirectional_Search):
+    def __init__(self, start_room: str, goal_room: str, m: Maze, graph_search: bool = True):
+        super().__init__(start_room, goal_room, m, graph_search, heuristic=False)
+
+
+class Bidirectional_A_Star_Search(Bidirectional_Search):
+    def __init__(self, start_room: str, goal_room: str, m: Maze, graph_search: bool = True):
+        super().__init__(start_room, goal_room, m, graph_search, heuristic=True)
+
+
+class Iterative_Deepening_A_Star_Search:
+    """
+        IDA* search: depth-first searches that are bounded by cost + heuristic, the bound is raised to the lowest
+        f that exceeded it after every iteration. The heuristic is the weighted Manhattan distance of A_Star_Search.
+
+        Only the current path and the depth-first stack are kept, so the memory grows with the depth of the search
+        instead of the number of rooms. The price is re-expanding the rooms of the earlier iterations, the count
+        is given by get_reexpansion_count().
+
+        Tree search (default) only prunes the rooms that are already on the current path. Graph search also keeps
+        a transposition table (room index -> lowest cost in this iteration) of at most max_nodes rooms, and a child
+        that is reached with a lower or equal cost before is pruned. When the table is full, new rooms are not added.
+    """
+    __start = None # room index
+    __goal = None  # room index
+    __maze = None
+    __heuristic = None  # room index -> estimated cost to the goal
+    __graph_search = None
+    __max_nodes = None
+    __stack = None  # depth-first stack of tuple(room, cost, depth)
+    __stack_peak = None
+    __path = None  # rooms of the current path
+    __path_rooms = None  # set of the rooms of the current path
+    __table = None  # transposition table of graph search
+    __threshold = None
+    __next_threshold = None
+    __iteration_count = None
+    __expanded_bits = None  # one bit per room that is expanded at least once
+    __reexpansion_count = None
+    __solution = None
+    __expanded_cost = None
+    __expanded_room = None
+    __expansion_count = None
+    __observer = None
+
+    def __init__(self, start_room: str, goal_room: str, m: Maze, graph_search: bool = False, max_nodes: int = 1 << 20):
+        """
+        :param max_nodes: capacity of the transposition table in graph search
+        """
+        self.__maze = m
+        self.__start = self.__maze.room_id(start_room)
+        self.__goal = self.__maze.room_id(goal_room)
+        self.__graph_search = graph_search
+        self.__max_nodes = max_nodes
+        self.__stack = []
+        self.__stack_peak = 0
+        self.__path = []
+        self.__path_rooms = set()
+        self.__table = {}
+        self.__threshold = 0
+        self.__next_threshold = INFINITY
+        self.__iteration_count = 0
+        self.__expanded_bits = bytearray((self.__maze.get_room_count() + 7) // 8)
+        self.__reexpansion_count = 0
+        self.__solution = ""
+        self.__expanded_cost = 0
+        self.__expanded_room = -1
+        self.__expansion_count = 0
+        self.__observer = None
+
+    def get_start_room(self):
+        return self.__maze.get_room_name(self.__start)
+
+    def get_goal_room(self):
+        return self.__maze.get_room_name(self.__goal)
+
+    def get_expanded_path(self):
+        return "-".join(self.__maze.get_room_name(r) for r in self.__path)
+
+    def get_expanded_cost(self):
+        return self.__expanded_cost
+
+    def get_expanded_room(self):
+        if self.__expanded_room == -1:
+            return ""
+        return self.__maze.get_room_name(self.__expanded_room)
+
+    def set_observer(self, observer):
+        """
+        :param observer: function that is called with an Expansion_Event after every expansion, None to stop
+        """
+        self.__observer = observer
+
+    def get_expansion_count(self):
+        return self.__expansion_count
+
+    def get_reexpansion_count(self):
+        """
+        :return: number of the expansions of the rooms that were already expanded before
+        """
+        return self.__reexpansion_count
+
+    def get_iteration_count(self):
+        return self.__iteration_count
+
+    def get_threshold(self):
+        """
+        :return: f bound of the current iteration
+        """
+        return self.__threshold
+
+    def get_frontier_size(self):
+        return len(self.__stack)
+
+    def get_frontier_peak(self):
+        return self.__stack_peak
+
+    def frontier_information(self):
+        """
+        :return: String that contains the rooms on the stack in removal order
+        """
+        fringe_str = ""
+        for room, cost, depth in reversed(self.__stack):
+            fringe_str += "{:<8s} ({:d})\n".format(self.__maze.get_room_name(room), cost + self.__heuristic[room])
+        return fringe_str
+
+    def frontier_snapshot(self, k: int = 10):
+        """
+        :return: the k first rooms of the stack and its statistics as in Frontier.get_snapshot(),
+        the stack is bounded by the depth of the search so the statistics are counted on every call
+        """
+        costs = [cost + self.__heuristic[room] for room, cost, depth in self.__stack]
+        histogram = {}
+        for f in costs:
+            histogram[f] = histogram.get(f, 0) + 1
+        return {
+            "entries": [(self.__maze.get_room_name(room), cost + self.__heuristic[room]) for room, cost, depth in reversed(self.__stack[-k:])] if k > 0 else [],
+            "size": len(costs),
+            "min_cost": min(costs) if costs else None,
+            "max_cost": max(costs) if costs else None,
+            "histogram": dict(sorted(histogram.items()))
+        }
+
+    def heuristic(self, r: int):
+        if self.__heuristic is None:
+            self.__heuristic = weighted_manhattan(self.__maze, self.__goal)
+        return self.__heuristic[r]
+
+    def start_search(self):
+        """
+            Initialize the first iteration with the heuristic of the start room as the bound
+        """
+        self.__heuristic = weighted_manhattan(self.__maze, self.__goal)
+        self.__threshold = self.__heuristic[self.__start]
+        self.__start_iteration()
+
+    def __start_iteration(self):
+        self.__iteration_count += 1
+        self.__next_threshold = INFINITY
+        self.__table.clear()
+        self.__table[self.__start] = 0
+        self.__stack.append((self.__start, 0, 0))
+        self.__stack_peak = max(self.__stack_peak, 1)
+
+    def expand_room(self):
+        """
+        Expand the room on top of the stack. Start the next iteration when the stack is empty.
+        :return: True if there cannot be no more expand
+        """
+        observer = self.__observer
+        if observer is not None:
+            pop_begin = perf_counter_ns()
+        stack = self.__stack
+        while not stack:
+            if self.__next_threshold == INFINITY:
+                logger.info("Fringe is empty. Cannot continue to search.")
+                self.__solution = False
+                return True
+            self.__threshold = self.__next_threshold
+            self.__start_iteration()
+
+        room, g, depth = stack.pop()
+        for r in self.__path[depth:]:
+            self.__path_rooms.discard(r)
+        del self.__path[depth:]
+        self.__path.append(room)
+        self.__path_rooms.add(room)
+
+        heuristic = self.__heuristic
+        self.__expanded_room = room
+        self.__expanded_cost = g + heuristic[room]
+        self.__expansion_count += 1
+        if self.__expanded_bits[room >> 3] & (1 << (room & 7)):
+            self.__reexpansion_count += 1
+        else:
+            self.__expanded_bits[room >> 3] |= 1 << (room & 7)
+
+        if room == self.__goal:
+            self.__solution = (list(self.__path), g)
+            if observer is not None:
+                pop_end = perf_counter_ns()
+                self.__notify(observer, g, 0, 0, pop_end - pop_begin, 0, 0, True)
+            return True
+        if observer is not None:
+            pop_end = perf_counter_ns()
+
+        neighbor_index, neighbor_cost, degree = self.__maze.get_adjacency()
+        start, end = self.__maze.neighbor_range(room)
+        if observer is not None:
+            neighbors_end = perf_counter_ns()
+        children = []
+        pruned = 0
+        for k in range(start, end):
+            key = neighbor_index[k]
+            tmp_cost = g + neighbor_cost[k]
+            f = tmp_cost + heuristic[key]
+            if key in self.__path_rooms:
+                pruned += 1
+                continue  # do not go around in a cycle
+            if f > self.__threshold:
+                pruned += 1
+                if f < self.__next_threshold:
+                    self.__next_threshold = f
+                continue
+            if self.__graph_search:
+                best = self.__table.get(key)
+                if best is not None and best <= tmp_cost:
+                    pruned += 1
+                    continue  # a path to this room with lower or equal cost is already searched in this iteration
+                if best is not None or len(self.__table) < self.__max_nodes:
+                    self.__table[key] = tmp_cost
+            children.append((f, key, tmp_cost))
+
+        children.sort(reverse=True)  # the child with the lowest f is on top of the stack
+        for f, key, tmp_cost in children:
+            stack.append((key, tmp_cost, depth + 1))
+        if len(stack) > self.__stack_peak:
+            self.__stack_peak = len(stack)
+
+        if observer is not None:
+            self.__notify(observer, g, len(children), pruned, pop_end - pop_begin, neighbors_end - pop_end, perf_counter_ns() - neighbors_end, False)
+
+    def __notify(self, observer, g, pushes, pruned, pop_ns, neighbors_ns, push_ns, goal_reached):
+        observer(Expansion_Event(self.__expansion_count, self.__expanded_room, g, self.__expanded_cost,
+                                 len(self.__stack), pushes, pruned, pop_ns, neighbors_ns, push_ns, goal_reached))
+
+    def get_solution_path(self):
+        """
+        :return: list of the room names from start to goal, None if the goal is not reached
+        """
+        if not self.__solution:
+            return None
+        return [self.__maze.get_room_name(r) for r in self.__solution[0]]
+
+    def get_solution_cost(self):
+        """
+        :return: cost of the solution path, None if the goal is not reached
+        """
+        if not self.__solution:
+            return None
+        return self.__solution[1]
+
+    def get_solution(self):
+        if not self.__solution:
+            return "Solution cannot be found"
+        else:
+            return "{: <15} :{: <5}".format("-".join(self.get_solution_path()), self.__solution[1])
+
+
+class Lifelong_Planning_A_Star:
+    """
+        Incremental A* (LPA*) between two rooms of a maze that keeps its search state across wall changes.
+
+        Every room has g (cost of the best path found) and rhs (one step look-ahead: the lowest g of a neighbor plus
+        the move cost). A room is locally inconsistent when they differ and only those rooms are put in the queue.
+        When a wall is put or removed, only the rhs of the two rooms it separates is updated, and the next
+        compute_shortest_path() call repairs the part of the search that depends on them instead of starting again.
+        The solution getters call compute_shortest_path() first when the walls changed after the last call.
+    """
+    __start = None # room index
+    __goal = None  # room index
+    __maze = None
+    __heuristic = None
+    __g = None  # room index -> g, missing rooms have infinite g
+    __rhs = None  # room index -> rhs, missing rooms have infinite rhs
+    __queue = None  # heap of (key1, key2, counter, room), may hold stale entries
+    __queue_keys = None  # room index -> its current key in the queue
+    __counter = None
+    __expansion_count = None
+    __last_expansion_count = None
+    __full_reset = None
+    __walls_dirty = None  # the walls changed after the last compute_shortest_path() call
+
+    def __init__(self, start_room: str, goal_room: str, m: Maze):
+        self.__maze = m
+        self.__start = self.__maze.room_id(start_room)
+        self.__goal = self.__maze.room_id(goal_room)
+        self.__heuristic = weighted_manhattan(self.__maze, self.__goal)
+        self.__expansion_count = 0
+        self.__last_expansion_count = 0
+        self.__walls_dirty = False
+        self.__reset()
+        self.__maze.add_wall_listener(self.__walls_changed)
+
+    def detach(self):
+        """
+        Stop listening to the walls of the maze
+        """
+        self.__maze.remove_wall_listener(self.__walls_changed)
+
+    def __reset(self):
+        self.__g = {}
+        self.__rhs = {self.__start: 0}
+        self.__queue = []
+        self.__queue_keys = {}
+        self.__counter = 0
+        self.__full_reset = False
+        self.__push(self.__start)
+
+    def __key(self, room: int):
+        cost = min(self.__g.get(room, INFINITY), self.__rhs.get(room, INFINITY))
+        return cost + self.__heuristic[room], cost
+
+    def __push(self, room: int):
+        key = self.__key(room)
+        self.__queue_keys[room] = key
+        heapq.heappush(self.__queue, (key[0], key[1], self.__counter, room))
+        self.__counter += 1
+
+    def __top_key(self):
+        """
+        :return: the lowest key in the queue, stale entries are dropped
+        """
+        while self.__queue:
+            k1, k2, _, room = self.__queue[0]
+            if self.__queue_keys.get(room) == (k1, k2):
+                return k1, k2
+            heapq.heappop(self.__queue)
+        return INFINITY, INFINITY
+
+    def __update_room(self, room: int):
+        """
+        Recompute the rhs of a room and put it in the queue if it is inconsistent
+        """
+        neighbor_index, neighbor_cost, degree = self.__maze.get_adjacency()
+        if room != self.__start:
+            rhs = INFINITY
+            base = room * MAX_NEIGHBORS
+            for k in range(base, base + degree[room]):
+                cost = self.__g.get(neighbor_index[k], INFINITY) + neighbor_cost[k]
+                if cost < rhs:
+                    rhs = cost
+            if rhs == INFINITY:
+                self.__rhs.pop(room, None)
+            else:
+                self.__rhs[room] = rhs
+        self.__queue_keys.pop(room, None)
+        if self.__g.get(room, INFINITY) != self.__rhs.get(room, INFINITY):
+            self.__push(room)
+
+    def __walls_changed(self, maze: Maze, rooms):
+        self.__walls_dirty = True
+        if rooms is None:
+            self.__full_reset = True  # all the walls are replaced
+        elif not self.__full_reset:
+            for room in rooms:
+                self.__update_room(room)
+
+    def compute_shortest_path(self):
+        """
+        Expand the inconsistent rooms until the goal is consistent and no room with a lower key is left
+        :return: True if the goal is reachable
+        """
+        if self.__full_reset:
+            self.__reset()
+        self.__walls_dirty = False
+        self.__last_expansion_count = 0
+        neighbor_index, neighbor_cost, degree = self.__maze.get_adjacency()
+        g = self.__g
+        rhs = self.__rhs
+        while self.__top_key() < self.__key(self.__goal) or rhs.get(self.__goal, INFINITY) != g.get(self.__goal, INFINITY):
+            if not self.__queue:
+                break
+            room = heapq.heappop(self.__queue)[3]
+            del self.__queue_keys[room]
+            self.__expansion_count += 1
+            self.__last_expansion_count += 1
+
+            if g.get(room, INFINITY) > rhs.get(room, INFINITY):
+                g[room] = rhs[room]  # the room becomes consistent
+            else:
+                g.pop(room, None)  # the room is under-consistent, its cost went up
+                self.__update_room(room)
+            base = room * MAX_NEIGHBORS
+            for k in range(base, base + degree[room]):
+                self.__update_room(neighbor_index[k])
+        return g.get(self.__goal, INFINITY) != INFINITY
+
+    def get_expansion_count(self):
+        """
+        :return: number of the expansions since the planner is created
+        """
+        return self.__expansion_count
+
+    def get_last_expansion_count(self):
+        """
+        :return: number of the expansions of the last compute_shortest_path() call
+        """
+        return self.__last_expansion_count
+
+    def get_solution_cost(self):
+        if self.__walls_dirty:
+            self.compute_shortest_path()
+        cost = self.__g.get(self.__goal, INFINITY)
+        return None if cost == INFINITY else cost
+
+    def get_solution_path(self):
+        """
+        :return: list of the room names from start to goal, None if the goal is not reachable
+        """
+        if self.get_solution_cost() is None:
+            return None
+        neighbor_index, neighbor_cost, degree = self.__maze.get_adjacency()
+        rooms = [self.__goal]
+        room = self.__goal
+        while room != self.__start:
+            best_room, best_cost = -1, INFINITY
+            base = room * MAX_NEIGHBORS
+            for k in range(base, base + degree[room]):
+                cost = self.__g.get(neighbor_index[k], INFINITY) + neighbor_cost[k]
+                if cost < best_cost:
+                    best_room, best_cost = neighbor_index[k], cost
+            # every step of a consistent search goes to a room with a lower g, anything else would loop forever
+            if best_room == -1 or self.__g[best_room] >= self.__g[room]:
+                raise RuntimeError("The search is not consistent at room {}".format(self.__maze.get_room_name(room)))
+            room = best_room
+            rooms.append(room)
+        rooms.reverse()
+        return [self.__maze.get_room_name(r) for r in rooms]
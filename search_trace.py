@@ -0,0 +1,105 @@
+"""
+Binary traces of the searches: one fixed-width record per expanded room, saved as a .npy structured array
+that is memory-mapped for the replay, so a trace of millions of steps opens at once and is read only where it is shown.
+
+    recorder = Trace_Recorder()
+    solve(maze, "A", "I", "ucs", observer=recorder)
+    recorder.save("ucs.npy")
+    trace = load_trace("ucs.npy")
+"""
+from array import array
+import numpy as np
+
+# step is the expansion count of the search (from 1), parent is the row that expanded the parent path,
+# -1 for the start room and for the searches without a single search tree
+TRACE_DTYPE = np.dtype([("step", "<i4"), ("room", "<i4"), ("parent", "<i4"), ("g", "<i8"), ("f", "<i8"), ("frontier_size", "<i4")])
+
+
+class Trace_Recorder:
+    """
+        Observer of a search (set_observer) that records every Expansion_Event as a TRACE_DTYPE row.
+
+        The rows are filled in fixed-size NumPy chunks and written one chunk after the other by save(),
+        so the trace is never copied as a whole. The row of every expanded node is kept to set the parent of its children.
+    """
+    CHUNK_SIZE = 65536
+
+    __chunks = None  # full chunks
+    __chunk = None  # chunk that is being filled
+    __chunk_size = None  # rows in the current chunk
+    __node_rows = None  # search node index -> row that expanded it
+    __observer = None
+
+    def __init__(self, observer=None):
+        """
+        :param observer: another observer that receives the events after they are recorded
+        """
+        self.__chunks = []
+        self.__chunk = np.zeros(Trace_Recorder.CHUNK_SIZE, dtype=TRACE_DTYPE)
+        self.__chunk_size = 0
+        self.__node_rows = array("i")
+        self.__observer = observer
+
+    def __call__(self, event):
+        parent = -1
+        if event.node != -1:
+            if event.parent_node != -1:
+                parent = self.__node_rows[event.parent_node]
+            if event.node >= len(self.__node_rows):
+                self.__node_rows.extend([-1] * (event.node + 1 - len(self.__node_rows)))
+            self.__node_rows[event.node] = self.get_size()
+
+        self.__chunk[self.__chunk_size] = (event.step, event.room, parent, event.g, event.f, event.frontier_size)
+        self.__chunk_size += 1
+        if self.__chunk_size == Trace_Recorder.CHUNK_SIZE:
+            self.__chunks.append(self.__chunk)
+            self.__chunk = np.zeros(Trace_Recorder.CHUNK_SIZE, dtype=TRACE_DTYPE)
+            self.__chunk_size = 0
+        if self.__observer is not None:
+            self.__observer(event)
+
+    def get_size(self):
+        return len(self.__chunks) * Trace_Recorder.CHUNK_SIZE + self.__chunk_size
+
+    def get_trace(self):
+        """
+        :return: the recorded rows as one array (a copy)
+        """
+        return np.concatenate(self.__chunks + [self.__chunk[:self.__chunk_size]])
+
+    def save(self, path: str):
+        """
+        Write the trace as a .npy file of TRACE_DTYPE rows
+        """
+        trace = np.lib.format.open_memmap(path, mode="w+", dtype=TRACE_DTYPE, shape=(self.get_size(),))
+        position = 0
+        for chunk in self.__chunks + [self.__chunk[:self.__chunk_size]]:
+            trace[position:position + len(chunk)] = chunk
+            position += len(chunk)
+        trace.flush()
+        del trace
+
+
+def load_trace(path: str, mmap_mode: str = "r"):
+    """
+    :param mmap_mode: passed to np.load, None to read the whole trace to memory
+    :return: structured array of TRACE_DTYPE rows, memory-mapped by default
+    """
+    trace = np.load(path, mmap_mode=mmap_mode)
+    if trace.dtype != TRACE_DTYPE or trace.ndim != 1:
+        raise ValueError("{} is not a search trace".format(path))
+    return trace
+
+
+def trace_path(trace, row: int):
+    """
+    :param row: index of a row of the trace
+    :return: list of the room indexes from the start room to the room expanded at that row, following the parents
+    """
+    rooms = []
+    while row != -1:
+        record = trace[row]
+        rooms.append(int(record["room"]))
+        row = int(record["parent"])
+    rooms.reverse()
+    return rooms
@@ -0,0 +1,115 @@
+"""
+Memoization of the solved paths for the mazes that are queried again and again with different start and goal rooms.
+"""
+from collections import OrderedDict
+import weakref
+from maze_search import Maze
+from solver import algorithm_name, solve
+
+
+class Solution_Cache:
+    """
+        A bounded LRU of search results keyed by (maze layout key, start, goal, algorithm, graph search, max expansions).
+
+        The layout key is the canonical encoding of the maze size, move costs and walls (Maze.get_layout_key()),
+        so mazes that are built separately with the same walls share their entries. The cache listens to the
+        walls of every maze that it solves: when the walls of a maze change, the entries of its old layout are dropped.
+    """
+    __max_size = None
+    __entries = None  # key -> result, in least to most recently used order
+    __layout_entries = None  # layout key -> set of the keys of its entries
+    __maze_layouts = None  # attached maze (weak reference) -> its layout key
+    __hits = None
+    __misses = None
+    __evictions = None
+    __invalidations = None
+
+    def __init__(self, max_size: int = 1024):
+        self.__max_size = max_size
+        self.__entries = OrderedDict()
+        self.__layout_entries = {}
+        self.__maze_layouts = weakref.WeakKeyDictionary()  # the cache does not keep the mazes alive
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__invalidations = 0
+
+    def get_size(self):
+        return len(self.__entries)
+
+    def get_statistics(self):
+        return {
+            "size": len(self.__entries),
+            "max_size": self.__max_size,
+            "hits": self.__hits,
+            "misses": self.__misses,
+            "evictions": self.__evictions,
+            "invalidations": self.__invalidations
+        }
+
+    def attach(self, maze: Maze):
+        """
+        Listen to the walls of the maze, so its entries are dropped when its walls change
+        """
+        if maze not in self.__maze_layouts:
+            self.__maze_layouts[maze] = maze.get_layout_key()
+            maze.add_wall_listener(self.__walls_changed)
+
+    def detach(self, maze: Maze):
+        if self.__maze_layouts.pop(maze, None) is not None:
+            maze.remove_wall_listener(self.__walls_changed)
+
+    def __walls_changed(self, maze: Maze, rooms):
+        old_layout = self.__maze_layouts[maze]
+        self.invalidate(old_layout)
+        self.__maze_layouts[maze] = maze.get_layout_key()
+
+    def invalidate(self, layout_key):
+        """
+        Drop all entries of a layout
+        """
+        for key in self.__layout_entries.pop(layout_key, ()):
+            del self.__entries[key]
+            self.__invalidations += 1
+
+    def clear(self):
+        self.__entries.clear()
+        self.__layout_entries.clear()
+
+    def solve(self, maze: Maze, start: str, goal: str, algorithm: str = "A* Search", graph_search: bool = True, max_expansions: int = None):
+        """
+        Same as solver.solve(), but the result is taken from the cache when the same query was solved before
+        with the same max_expansions
+        :return: dictionary with the path, its cost and the statistics of the search that solved it first
+        """
+        self.attach(maze)
+        layout_key = maze.get_layout_key()
+        key = (layout_key, start, goal, algorithm_name(algorithm), graph_search, max_expansions)
+
+        result = self.__entries.get(key)
+        if result is not None:
+            self.__hits += 1
+            self.__entries.move_to_end(key)
+        else:
+            self.__misses += 1
+            result = solve(maze, start, goal, algorithm, graph_search, max_expansions)
+            self.__entries[key] = result
+            self.__layout_entries.setdefault(layout_key, set()).add(key)
+            if len(self.__entries) > self.__max_size:
+                self.__evict()
+
+        result = dict(result)
+        if result["path"] is not None:
+            result["path"] = list(result["path"])
+        return result
+
+    def __evict(self):
+        """
+        Drop the least recently used entry
+        """
+        key, _ = self.__entries.popitem(last=False)
+        layout_keys = self.__layout_entries[key[0]]
+        layout_keys.discard(key)
+        if not layout_keys:
+            del self.__layout_entries[key[0]]
+        self.__evictions += 1
@@ -0,0 +1,246 @@
+"""
+Headless entry point of the maze searches. It never imports tkinter or PIL, the GUI is loaded only with --gui.
+
+    python -m solver --size 3x3 --walls A-B,E-H --start A --goal I --algorithm astar
+    python -m solver --maze maze.txt --algorithm astar
+
+prints the solution path, its cost and the expansion statistics as JSON.
+"""
+import argparse
+import cProfile
+import io
+import json
+import pstats
+import sys
+import time
+import tracemalloc
+from maze_search import Maze, Uniform_Cost_Search, A_Star_Search, Bidirectional_Search, Bidirectional_Uniform_Cost_Search, \
+    Bidirectional_A_Star_Search, Iterative_Deepening_A_Star_Search
+from search_trace import Trace_Recorder, load_trace
+from maze_file import load_maze
+
+ALGORITHMS = {
+    "Uniform Cost Search": Uniform_Cost_Search,
+    "A* Search": A_Star_Search,
+    "Bidirectional Uniform Cost Search": Bidirectional_Uniform_Cost_Search,
+    "Bidirectional A* Search": Bidirectional_A_Star_Search,
+    "IDA* Search": Iterative_Deepening_A_Star_Search
+}
+
+TREE_SEARCH_LIMIT = 100000  # default max_expansions of a tree search, it may never end when the goal cannot be reached
+
+ALGORITHM_ALIASES = {
+    "ucs": "Uniform Cost Search",
+    "astar": "A* Search",
+    "a*": "A* Search",
+    "bi-ucs": "Bidirectional Uniform Cost Search",
+    "bi-astar": "Bidirectional A* Search",
+    "idastar": "IDA* Search",
+    "ida*": "IDA* Search"
+}
+
+
+def algorithm_name(name: str):
+    """
+    :param name: name of the algorithm as in ALGORITHMS or one of its aliases ("ucs", "astar")
+    :return: the name of the algorithm as in ALGORITHMS
+    """
+    if name in ALGORITHMS:
+        return name
+    try:
+        return ALGORITHM_ALIASES[name.lower()]
+    except KeyError:
+        raise ValueError("Unknown search algorithm: {}".format(name))
+
+
+def build_maze(width: int = 3, height: int = 3, walls=(), horizontal_cost: int = 2, vertical_cost: int = 1):
+    """
+    :param walls: list of walls as "A-B" strings
+    :return: Maze object with the walls set
+    """
+    maze = Maze(width, height, horizontal_cost, vertical_cost)
+    maze.set_walls(walls)
+    return maze
+
+
+def create_search(algorithm: str, start: str, goal: str, maze: Maze, graph_search: bool = True, max_nodes: int = None):
+    """
+    :param max_nodes: capacity of the transposition table of IDA* graph search, None for the default
+    :return: search object of the algorithm that is ready to expand rooms
+    """
+    search_class = ALGORITHMS[algorithm_name(algorithm)]
+    if max_nodes is None:
+        search_algorithm = search_class(start, goal, maze, graph_search=graph_search)
+    elif search_class is Iterative_Deepening_A_Star_Search and graph_search:
+        search_algorithm = search_class(start, goal, maze, graph_search=graph_search, max_nodes=max_nodes)
+    else:
+        raise ValueError("max_nodes is only used by IDA* graph search")
+    search_algorithm.start_search()
+    return search_algorithm
+
+
+def solve(maze: Maze, start: str, goal: str, algorithm: str = "A* Search", graph_search: bool = True, max_expansions: int = None, observer=None,
+          max_nodes: int = None):
+    """
+    Run a search to the end without any GUI
+    :param max_expansions: stop the search after that many expansions, TREE_SEARCH_LIMIT when None for tree search
+    (tree search may not end on mazes with cycles)
+    :param observer: function that receives an Expansion_Event after every expansion
+    :param max_nodes: capacity of the transposition table of IDA* graph search, see create_search()
+    :return: dictionary with the path (list of room names, None if not found), its cost, whether the search
+    finished before max_expansions and the search statistics, IDA* also reports its re-expansions and iterations
+    """
+    if max_expansions is None and not graph_search:
+        max_expansions = TREE_SEARCH_LIMIT
+    begin = time.perf_counter()
+    search_algorithm = create_search(algorithm, start, goal, maze, graph_search, max_nodes)
+    search_algorithm.set_observer(observer)
+    finished = False
+    while not finished:
+        finished = bool(search_algorithm.expand_room())
+        if max_expansions is not None and search_algorithm.get_expansion_count() >= max_expansions:
+            break
+    result = {
+        "algorithm": algorithm_name(algorithm),
+        "start": start,
+        "goal": goal,
+        "path": search_algorithm.get_solution_path(),
+        "cost": search_algorithm.get_solution_cost(),
+        "finished": finished,
+        "expansions": search_algorithm.get_expansion_count(),
+        "frontier_peak": search_algorithm.get_frontier_peak(),
+        "seconds": time.perf_counter() - begin
+    }
+    if isinstance(search_algorithm, Iterative_Deepening_A_Star_Search):
+        result["reexpansions"] = search_algorithm.get_reexpansion_count()
+        result["iterations"] = search_algorithm.get_iteration_count()
+    return result
+
+
+def profile_solve(maze: Maze, start: str, goal: str, algorithm: str = "A* Search", graph_search: bool = True, max_expansions: int = None,
+                  profile: bool = True, trace_memory: bool = True, sort: str = "cumulative", limit: int = 20, max_nodes: int = None):
+    """
+    Run solve() under cProfile and/or tracemalloc, both slow the search down so they are only on when asked
+    :return: the result of solve() with "profile" (pstats report of the first limit functions) and "peak_memory_bytes"
+    """
+    maze.get_adjacency()  # the index is part of the maze, not of the search
+    profiler = cProfile.Profile() if profile else None
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        if profiler is not None:
+            profiler.enable()
+        result = solve(maze, start, goal, algorithm, graph_search, max_expansions, max_nodes=max_nodes)
+        if profiler is not None:
+            profiler.disable()
+        if trace_memory:
+            result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    if profiler is not None:
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats(sort).print_stats(limit)
+        result["profile"] = report.getvalue()
+    return result
+
+
+def parse_size(size: str):
+    """
+    :param size: "WIDTHxHEIGHT" string
+    :return: tuple(width, height)
+    """
+    width, height = size.lower().split("x")
+    return int(width), int(height)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m solver", description="Solve a maze without the GUI")
+    parser.add_argument("--size", default="3x3", help="WIDTHxHEIGHT of the maze (default 3x3)")
+    parser.add_argument("--walls", default="", help="comma separated walls, e.g. A-B,E-H")
+    parser.add_argument("--maze", default=None, help="maze file (ASCII grid or .npy) instead of --size and --walls, "
+                                                     "its start and goal rooms are used unless --start and --goal are given")
+    parser.add_argument("--start", help="name of the start room")
+    parser.add_argument("--goal", help="name of the goal room")
+    parser.add_argument("--algorithm", default="A* Search", help="ucs, astar, bi-ucs, bi-astar, idastar or the full name of the algorithm")
+    parser.add_argument("--tree-search", action="store_true", help="expand rooms again through different paths")
+    parser.add_argument("--max-expansions", type=int, default=None,
+                        help="stop the search after that many expansions (default {} for --tree-search)".format(TREE_SEARCH_LIMIT))
+    parser.add_argument("--max-nodes", type=int, default=None, help="capacity of the transposition table of IDA* graph search")
+    parser.add_argument("--horizontal-cost", type=int, default=2)
+    parser.add_argument("--vertical-cost", type=int, default=1)
+    parser.add_argument("--profile", action="store_true", help="run the search under cProfile and print the report to stderr")
+    parser.add_argument("--trace-memory", action="store_true", help="report the peak memory of the search (tracemalloc)")
+    parser.add_argument("--events", default=None, help="file to write one JSON line per expansion")
+    parser.add_argument("--trace", default=None, help=".npy file to record the expansions as a binary trace")
+    parser.add_argument("--replay", default=None, help=".npy trace to replay with --gui instead of searching")
+    parser.add_argument("--gui", action="store_true", help="open the GUI instead, the search page of the maze when --start and --goal are given")
+    args = parser.parse_args(argv)
+
+    if (args.trace is not None or args.events is not None) and (args.profile or args.trace_memory):
+        parser.error("--trace and --events cannot be used with --profile or --trace-memory")
+    if args.tree_search and issubclass(ALGORITHMS[algorithm_name(args.algorithm)], Bidirectional_Search):
+        parser.error("--tree-search cannot be used with a bidirectional search")
+    if args.max_nodes is not None and (args.tree_search or ALGORITHMS[algorithm_name(args.algorithm)] is not Iterative_Deepening_A_Star_Search):
+        parser.error("--max-nodes is only used by IDA* graph search")
+
+    maze = None
+    if args.maze is not None:
+        maze = load_maze(args.maze)
+        args.start = args.start or maze.get_start() or None
+        args.goal = args.goal or maze.get_goal() or None
+    if args.replay is not None and (not args.gui or args.start is None or args.goal is None):
+        parser.error("--replay needs --gui, --start and --goal")
+
+    if args.gui and (args.start is None or args.goal is None):
+        import Game  # tkinter and PIL are loaded only here
+        Game.main()
+        return
+
+    if args.start is None or args.goal is None:
+        parser.error("--start and --goal are required")
+
+    if maze is None:
+        width, height = parse_size(args.size)
+        walls = [wall for wall in args.walls.split(",") if wall]
+        maze = build_maze(width, height, walls, args.horizontal_cost, args.vertical_cost)
+    if args.gui:
+        import Game
+        maze.set_start(args.start)
+        maze.set_goal(args.goal)
+        maze.set_search_algorithm(algorithm_name(args.algorithm))
+        if args.replay is not None:
+            Game.game_second_page(maze, None, trace=load_trace(args.replay))
+        else:
+            expansion_limit = args.max_expansions if args.max_expansions is not None or not args.tree_search else TREE_SEARCH_LIMIT
+            Game.game_second_page(maze, create_search(args.algorithm, args.start, args.goal, maze, not args.tree_search, args.max_nodes),
+                                  args.max_expansions, expansion_limit=expansion_limit)
+        return
+    if args.profile or args.trace_memory:
+        result = profile_solve(maze, args.start, args.goal, args.algorithm, not args.tree_search, args.max_expansions,
+                               profile=args.profile, trace_memory=args.trace_memory, max_nodes=args.max_nodes)
+        report = result.pop("profile", None)
+        if report is not None:
+            print(report, file=sys.stderr)
+    elif args.events is not None or args.trace is not None:
+        events_file = open(args.events, "w") if args.events is not None else None
+        try:
+            def write_event(event):
+                events_file.write(json.dumps(event.as_dict()) + "\n")
+            observer = write_event if events_file is not None else None
+            recorder = Trace_Recorder(observer) if args.trace is not None else None
+            result = solve(maze, args.start, args.goal, args.algorithm, not args.tree_search, args.max_expansions,
+                           recorder if recorder is not None else observer, args.max_nodes)
+        finally:
+            if events_file is not None:
+                events_file.close()
+        if recorder is not None:
+            recorder.save(args.trace)
+    else:
+        result = solve(maze, args.start, args.goal, args.algorithm, not args.tree_search, args.max_expansions, max_nodes=args.max_nodes)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
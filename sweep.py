@@ -0,0 +1,193 @@
+"""
+Exhaustive sweep over every wall configuration and every (start, goal) pair of a maze size,
+to check that the search algorithms agree on the optimal costs.
+
+    python -m sweep --size 3x3 --workers 8 --out sweep_results
+    python -m sweep --size 3x3 --batched --out sweep_results   # costs only, with the batched wavefront solver
+
+The wall configurations are split in chunks that run in a process pool. Every chunk streams its rows to its own
+CSV file in the output directory and returns only its aggregate counters, so memory does not grow with the sweep.
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from maze_search import Maze
+from solver import ALGORITHMS, algorithm_name, create_search, parse_size
+from wavefront import UNREACHABLE, all_pairs_costs, masks_to_walls
+
+
+def empty_statistics():
+    return {"searches": 0, "solved": 0, "expansions_total": 0, "expansions_max": 0, "frontier_peak_total": 0, "frontier_peak_max": 0}
+
+
+def merge_summary(summary: dict, chunk_summary: dict):
+    """
+    Add the counters of a chunk to the summary
+    """
+    summary["jobs"] += chunk_summary["jobs"]
+    summary["cost_agreement"] += chunk_summary["cost_agreement"]
+    summary["cost_disagreement"] += chunk_summary["cost_disagreement"]
+    for name, statistics in chunk_summary["algorithms"].items():
+        total = summary["algorithms"].setdefault(name, empty_statistics())
+        for key, value in statistics.items():
+            if key.endswith("_max"):
+                total[key] = max(total[key], value)
+            else:
+                total[key] += value
+
+
+def sweep_chunk(width: int, height: int, first_mask: int, last_mask: int, algorithms, out_path: str = None):
+    """
+    Run every algorithm for every (start, goal) pair on the wall masks in [first_mask, last_mask)
+    :param out_path: CSV file that the rows are written to, no rows are kept when None
+    :return: aggregate counters of the chunk
+    """
+    maze = Maze(width, height)
+    rooms = [maze.get_room_name(r) for r in range(maze.get_room_count())]
+    summary = {"jobs": 0, "cost_agreement": 0, "cost_disagreement": 0, "algorithms": {name: empty_statistics() for name in algorithms}}
+
+    out_file = open(out_path, "w", newline="") if out_path is not None else None
+    writer = csv.writer(out_file) if out_file is not None else None
+    if writer is not None:
+        header = ["walls", "start", "goal"]
+        for name in algorithms:
+            header += [name + " cost", name + " expansions", name + " frontier peak"]
+        writer.writerow(header)
+
+    try:
+        for mask in range(first_mask, last_mask):
+            maze.set_wall_mask(mask)
+            for start in rooms:
+                for goal in rooms:
+                    row = [mask, start, goal]
+                    costs = []
+                    for name in algorithms:
+                        search_algorithm = create_search(name, start, goal, maze)
+                        while not search_algorithm.expand_room():
+                            pass
+                        cost = search_algorithm.get_solution_cost()
+                        expansions = search_algorithm.get_expansion_count()
+                        frontier_peak = search_algorithm.get_frontier_peak()
+                        costs.append(cost)
+                        row += [cost, expansions, frontier_peak]
+
+                        statistics = summary["algorithms"][name]
+                        statistics["searches"] += 1
+                        statistics["solved"] += cost is not None
+                        statistics["expansions_total"] += expansions
+                        statistics["expansions_max"] = max(statistics["expansions_max"], expansions)
+                        statistics["frontier_peak_total"] += frontier_peak
+                        statistics["frontier_peak_max"] = max(statistics["frontier_peak_max"], frontier_peak)
+
+                    summary["jobs"] += 1
+                    if all(cost == costs[0] for cost in costs):
+                        summary["cost_agreement"] += 1
+                    else:
+                        summary["cost_disagreement"] += 1
+                    if writer is not None:
+                        writer.writerow(row)
+    finally:
+        if out_file is not None:
+            out_file.close()
+    return summary
+
+
+def sweep(width: int = 3, height: int = 3, algorithms=None, workers: int = None, chunk_size: int = 64, out_dir: str = None, mask_range=None):
+    """
+    Sweep all wall masks of the maze size (or the masks in mask_range) in a process pool
+    :param algorithms: names of the algorithms to compare, all of ALGORITHMS by default
+    :param chunk_size: number of wall masks in one job of the pool
+    :param out_dir: directory that the CSV rows of the chunks and summary.json are written to
+    :return: summary with the cost agreement counts and the statistics of every algorithm
+    """
+    algorithms = [algorithm_name(name) for name in (algorithms or ALGORITHMS)]
+    if mask_range is None:
+        mask_range = (0, 2 ** Maze(width, height).get_edge_count())
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+
+    chunks = []
+    for index, first_mask in enumerate(range(mask_range[0], mask_range[1], chunk_size)):
+        last_mask = min(first_mask + chunk_size, mask_range[1])
+        out_path = os.path.join(out_dir, "chunk_{:06d}.csv".format(index)) if out_dir is not None else None
+        chunks.append((first_mask, last_mask, out_path))
+
+    begin = time.perf_counter()
+    summary = {"jobs": 0, "cost_agreement": 0, "cost_disagreement": 0, "algorithms": {name: empty_statistics() for name in algorithms}}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(sweep_chunk, width, height, first_mask, last_mask, algorithms, out_path)
+                   for first_mask, last_mask, out_path in chunks]
+        for future in futures:
+            merge_summary(summary, future.result())
+
+    for statistics in summary["algorithms"].values():
+        searches = max(statistics["searches"], 1)
+        statistics["expansions_mean"] = statistics["expansions_total"] / searches
+        statistics["frontier_peak_mean"] = statistics["frontier_peak_total"] / searches
+    summary["seconds"] = time.perf_counter() - begin
+
+    if out_dir is not None:
+        with open(os.path.join(out_dir, "summary.json"), "w") as summary_file:
+            json.dump(summary, summary_file, indent=2)
+    return summary
+
+
+def sweep_costs(width: int = 3, height: int = 3, chunk_size: int = 4096, out_dir: str = None, mask_range=None):
+    """
+    Solve every (start, goal) pair of every wall mask with the batched wavefront solver, without search statistics
+    :param chunk_size: number of wall masks solved in one batch
+    :param out_dir: directory that costs.npy ((masks, rooms, rooms) costs, -1 when unreachable) and summary.json are written to,
+    the chunks are written to the memory-mapped costs.npy as they are solved
+    :return: tuple(cost array, memory-mapped when out_dir is given, summary)
+    """
+    if mask_range is None:
+        mask_range = (0, 2 ** Maze(width, height).get_edge_count())
+    rooms = width * height
+    shape = (mask_range[1] - mask_range[0], rooms, rooms)
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+        costs = np.lib.format.open_memmap(os.path.join(out_dir, "costs.npy"), mode="w+", dtype=np.int64, shape=shape)
+    else:
+        costs = np.empty(shape, dtype=np.int64)
+
+    begin = time.perf_counter()
+    solved = 0
+    for first_mask in range(mask_range[0], mask_range[1], chunk_size):
+        masks = np.arange(first_mask, min(first_mask + chunk_size, mask_range[1]), dtype=np.uint64)
+        chunk_costs = all_pairs_costs(*masks_to_walls(masks, width, height))
+        costs[first_mask - mask_range[0]:first_mask - mask_range[0] + len(masks)] = chunk_costs
+        solved += int(np.count_nonzero(chunk_costs != UNREACHABLE))
+    summary = {"jobs": int(costs.size), "solved": solved, "seconds": time.perf_counter() - begin}
+
+    if out_dir is not None:
+        costs.flush()
+        with open(os.path.join(out_dir, "summary.json"), "w") as summary_file:
+            json.dump(summary, summary_file, indent=2)
+    return costs, summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sweep", description="Compare the search algorithms on every wall configuration")
+    parser.add_argument("--size", default="3x3", help="WIDTHxHEIGHT of the maze (default 3x3)")
+    parser.add_argument("--algorithms", default=None, help="comma separated algorithms, all by default")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes (default: number of CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="wall configurations per job")
+    parser.add_argument("--out", default=None, help="directory for the CSV rows and summary.json")
+    parser.add_argument("--batched", action="store_true", help="only compute the costs with the batched wavefront solver")
+    args = parser.parse_args(argv)
+
+    width, height = parse_size(args.size)
+    if args.batched:
+        _, summary = sweep_costs(width, height, out_dir=args.out)
+        print(json.dumps(summary, indent=2))
+        return
+    algorithms = args.algorithms.split(",") if args.algorithms else None
+    summary = sweep(width, height, algorithms, args.workers, args.chunk_size, args.out)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+from maze_search import Maze, Lifelong_Planning_A_Star
+
+
+def plan(walls=()):
+    maze = Maze()
+    maze.set_walls(walls)
+    planner = Lifelong_Planning_A_Star("A", "I", maze)
+    planner.compute_shortest_path()
+    return maze, planner
+
+
+def test_lpa_star_path_after_a_wall_is_put():
+    maze, planner = plan()
+    maze.set_wall(maze.room_id("A"), maze.room_id("B"))
+    path = planner.get_solution_path()
+    assert path[:2] == ["A", "D"] and path[-1] == "I" and len(path) == 5
+    assert planner.get_solution_cost() == 6
+
+
+def test_lpa_star_path_after_the_goal_is_walled_off():
+    maze, planner = plan()
+    maze.set_wall(maze.room_id("F"), maze.room_id("I"))
+    maze.set_wall(maze.room_id("H"), maze.room_id("I"))
+    assert planner.get_solution_path() is None
+    assert planner.get_solution_cost() is None
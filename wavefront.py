@@ -0,0 +1,111 @@
+"""
+Batched shortest path costs for many mazes of the same size at once.
+
+The walls of B mazes are stacked in (B, H, W - 1) and (B, H - 1, W) boolean arrays. A distance map of shape
+(B, H, W) is relaxed from the start rooms with whole-array NumPy operations (one step in the four directions for
+every maze at the same time) until it does not change anymore, so there is no Python work per room or per maze.
+"""
+import numpy as np
+from maze_search import Maze
+
+UNREACHABLE = -1
+
+UNSET = np.int64(1) << np.int64(40)  # distance of the rooms that are not reached yet, far above any path cost
+
+
+def masks_to_walls(masks, width: int = 3, height: int = 3):
+    """
+    Decode many wall masks of Maze.get_wall_mask() at once
+    :param masks: array of integer masks, the masks must fit in 64 bits
+    :return: tuple(horizontal walls (B, H, W - 1), vertical walls (B, H - 1, W)) boolean arrays
+    """
+    masks = np.asarray(masks, dtype=np.uint64)
+    slots = Maze.edge_slots(width, height)
+    edge_count = int(slots.sum())
+    if edge_count > 64:
+        raise ValueError("Wall masks of {}x{} mazes do not fit in 64 bits".format(width, height))
+    bits = (masks[:, None] >> np.arange(edge_count, dtype=np.uint64)) & np.uint64(1)
+    walls = np.zeros((len(masks), height, width, 2), dtype=bool)
+    walls[:, slots] = bits.astype(bool)
+    return walls[:, :, :-1, 0], walls[:, :-1, :, 1]
+
+
+def stack_walls(mazes):
+    """
+    :param mazes: Maze objects of the same size
+    :return: tuple(horizontal walls, vertical walls) of all mazes stacked on the first axis
+    """
+    arrays = [maze.get_wall_arrays() for maze in mazes]
+    return np.stack([horizontal for horizontal, _ in arrays]), np.stack([vertical for _, vertical in arrays])
+
+
+def batch_distances(horizontal_walls, vertical_walls, starts, horizontal_cost: int = 2, vertical_cost: int = 1):
+    """
+    Relax the distances from the start room of every maze until convergence (Bellman-Ford on the grid)
+    :param horizontal_walls: (B, H, W - 1) boolean array
+    :param vertical_walls: (B, H - 1, W) boolean array
+    :param starts: (B,) room indexes (row * W + column)
+    :return: (B, H, W) int64 array of the costs from the start rooms, UNREACHABLE where there is no path
+    """
+    horizontal_walls = np.asarray(horizontal_walls, dtype=bool)
+    vertical_walls = np.asarray(vertical_walls, dtype=bool)
+    batch, height = vertical_walls.shape[0], vertical_walls.shape[1] + 1
+    width = horizontal_walls.shape[2] + 1
+    starts = np.broadcast_to(np.asarray(starts, dtype=np.int64), (batch,))
+
+    # cost of crossing every edge, UNSET through the walls
+    horizontal_step = np.where(horizontal_walls, UNSET, np.int64(horizontal_cost))
+    vertical_step = np.where(vertical_walls, UNSET, np.int64(vertical_cost))
+
+    distance = np.full((batch, height, width), UNSET, dtype=np.int64)
+    distance.reshape(batch, -1)[np.arange(batch), starts] = 0
+    while True:
+        relaxed = distance.copy()
+        np.minimum(relaxed[:, :, 1:], distance[:, :, :-1] + horizontal_step, out=relaxed[:, :, 1:])  # move right
+        np.minimum(relaxed[:, :, :-1], distance[:, :, 1:] + horizontal_step, out=relaxed[:, :, :-1])  # move left
+        np.minimum(relaxed[:, 1:, :], distance[:, :-1, :] + vertical_step, out=relaxed[:, 1:, :])  # move down
+        np.minimum(relaxed[:, :-1, :], distance[:, 1:, :] + vertical_step, out=relaxed[:, :-1, :])  # move up
+        if np.array_equal(relaxed, distance):
+            break
+        distance = relaxed
+    distance[distance >= UNSET] = UNREACHABLE
+    return distance
+
+
+def batch_solve(horizontal_walls, vertical_walls, starts, goals, horizontal_cost: int = 2, vertical_cost: int = 1):
+    """
+    :param starts: (B,) start room indexes
+    :param goals: (B,) goal room indexes
+    :return: (B,) int64 array of the shortest path costs, UNREACHABLE where the goal cannot be reached
+    """
+    distance = batch_distances(horizontal_walls, vertical_walls, starts, horizontal_cost, vertical_cost)
+    goals = np.broadcast_to(np.asarray(goals, dtype=np.int64), (distance.shape[0],))
+    return distance.reshape(distance.shape[0], -1)[np.arange(distance.shape[0]), goals]
+
+
+def all_pairs_costs(horizontal_walls, vertical_walls, horizontal_cost: int = 2, vertical_cost: int = 1):
+    """
+    Solve every (start, goal) pair of every maze, the mazes are repeated once per start room in one batch
+    :return: (B, rooms, rooms) int64 array, [b, s, g] is the cost from room s to room g in maze b
+    """
+    horizontal_walls = np.asarray(horizontal_walls, dtype=bool)
+    vertical_walls = np.asarray(vertical_walls, dtype=bool)
+    batch, height = vertical_walls.shape[0], vertical_walls.shape[1] + 1
+    rooms = height * (horizontal_walls.shape[2] + 1)
+    distance = batch_distances(np.repeat(horizontal_walls, rooms, axis=0), np.repeat(vertical_walls, rooms, axis=0),
+                               np.tile(np.arange(rooms), batch), horizontal_cost, vertical_cost)
+    return distance.reshape(batch, rooms, rooms)
+
+
+def maze_costs(maze: Maze, starts, goals):
+    """
+    :param starts: start room names
+    :param goals: goal room names, one for every start room
+    :return: (len(starts),) costs in the maze, UNREACHABLE where the goal cannot be reached
+    """
+    horizontal_walls, vertical_walls = maze.get_wall_arrays()
+    batch = len(starts)
+    return batch_solve(np.broadcast_to(horizontal_walls, (batch,) + horizontal_walls.shape),
+                       np.broadcast_to(vertical_walls, (batch,) + vertical_walls.shape),
+                       [maze.room_id(room) for room in starts], [maze.room_id(room) for room in goals],
+                       maze.get_horizontal_cost(), maze.get_vertical_cost())